@@ -0,0 +1,256 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ANIME_ID = "1234"
+ANIME_SLUG = f"bench-anime-{ANIME_ID}"
+ANIME_NAME = "Bench Anime"
+# (height, bandwidth) of the variants listed in every master playlist
+VARIANTS: tuple[tuple[int, int], ...] = ((360, 800_000), (720, 2_500_000), (1080, 5_000_000))
+
+
+def episode_list_html(episodes: int, slug: str = ANIME_SLUG) -> str:
+    """The episode list fragment the site returns, one `data-number` anchor per episode."""
+    links = "".join(
+        f'<a title="Episode {number}" class="ssl-item ep-item" data-number="{number}" '
+        f'data-id="{1000 + number}" href="/watch/{slug}?ep={1000 + number}">'
+        f'<div class="ssli-order">{number}</div></a>'
+        for number in range(1, episodes + 1)
+    )
+    return f'<div class="ss-list">{links}</div>'
+
+
+def series_page_html(episodes: int, filler: int = 2000) -> str:
+    """A rendered watch page: the episode list among `filler` blocks of unrelated markup."""
+    block = (
+        '<div class="flw-item"><div class="film-poster"><img data-src="/poster.jpg" alt="Poster &amp; art">'
+        '<a href="/watch/other-1" class="film-poster-ahref item-qtip" title="Other"></a></div>'
+        '<h3 class="film-name"><a href="/other-1">Other</a></h3><script>var x = "<a>";</script></div>'
+    )
+    return f"<html><body>{block * (filler // 2)}{episode_list_html(episodes)}{block * (filler // 2)}</body></html>"
+
+
+def vtt_timestamp(seconds: float) -> str:
+    return f"{int(seconds // 3600):02d}:{int(seconds // 60 % 60):02d}:{seconds % 60:06.3f}"
+
+
+def vtt_document(cues: int) -> str:
+    lines = ["WEBVTT", ""]
+    for i in range(cues):
+        lines.append(f"{i + 1}")
+        lines.append(f"{vtt_timestamp(i * 2)} --> {vtt_timestamp(i * 2 + 1.5)}")
+        lines.append(f"<i>Line {i}</i> of the subtitle &amp; some more text")
+        lines.append("")
+    return "\n".join(lines)
+
+
+class FakeSite:
+    """
+    Local stand-in for the site and its HLS origin, serving on 127.0.0.1.
+
+    Serves the search page, the `anisc-detail` series page, the AJAX episode list, server and
+    source endpoints, the embed getSources call and master/variant playlists with segments
+    and subtitles. `latency` (seconds) is added to every response, `bandwidth` (bytes per
+    second) throttles segment bodies and `error_rate` is the share of HLS requests that fail
+    with a 503.
+
+    For tests, requests whose path and query match one of the `broken` patterns fail with a 500,
+    and `encrypted` makes getSources answer with encrypted sources like the live site sometimes
+    does.
+    """
+
+    def __init__(
+        self,
+        episodes: int = 12,
+        segments: int = 10,
+        segment_size: int = 256 * 1024,
+        latency: float = 0.0,
+        bandwidth: int | None = None,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        broken: tuple[str, ...] = (),
+        encrypted: bool = False,
+    ) -> None:
+        self.episodes = episodes
+        self.segments = segments
+        self.segment_size = segment_size
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.broken = broken
+        self.encrypted = encrypted
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._segment = bytes(range(256)) * (segment_size // 256 + 1)
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def url(self) -> str:
+        assert self._server, "FakeSite is not running"
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeSite":
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                site.handle(self)
+
+            def do_HEAD(self):
+                site.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-site", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeSite":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            self.requests += 1
+            fail = request.path.startswith("/hls/") and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            return self.send(request, 503, b"unavailable", "text/plain")
+        if any(re.fullmatch(pattern, request.path) for pattern in self.broken):
+            return self.send(request, 500, b"broken", "text/plain")
+
+        parsed = urlparse(request.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        path = parsed.path
+
+        if path == "/search":
+            return self.send(request, 200, self.search_page().encode(), "text/html")
+        if path in (f"/{ANIME_SLUG}", f"/watch/{ANIME_SLUG}"):
+            return self.send(request, 200, self.detail_page().encode(), "text/html")
+        if path == f"/ajax/v2/episode/list/{ANIME_ID}":
+            return self.send_json(request, {"status": True, "html": episode_list_html(self.episodes)})
+        if path == "/ajax/v2/episode/servers":
+            episode_id = query.get("episodeId", "")
+            html = "".join(
+                f'<div class="item server-item" data-type="{kind}" data-id="{episode_id}-{kind}-{i}">'
+                f'<a class="btn">HD-{i}</a></div>'
+                for kind in ("sub", "dub")
+                for i in (1, 2)
+            )
+            return self.send_json(request, {"status": True, "html": html})
+        if path == "/ajax/v2/episode/sources":
+            episode_id = query.get("id", "").split("-")[0]
+            return self.send_json(request, {"type": "iframe", "link": f"{self.url}/embed-2/e-1/{episode_id}?k=1"})
+        if path == "/embed-2/e-1/getSources":
+            episode_id = query.get("id", "")
+            if self.encrypted:
+                return self.send_json(request, {"sources": "U2FsdGVkX1...", "tracks": [], "encrypted": True})
+            return self.send_json(
+                request,
+                {
+                    "sources": [{"file": f"{self.url}/hls/{episode_id}/master.m3u8", "type": "hls"}],
+                    "tracks": [
+                        {"file": f"{self.url}/subs/{episode_id}.vtt", "label": "English", "kind": "captions", "default": True},
+                        {"file": f"{self.url}/hls/{episode_id}/thumbnails.vtt", "kind": "thumbnails"},
+                    ],
+                    "encrypted": False,
+                },
+            )
+        if re.fullmatch(r"/hls/(\w+)/master\.m3u8", path):
+            return self.send(request, 200, self.master_playlist().encode(), "application/vnd.apple.mpegurl")
+        if re.fullmatch(r"/hls/(\w+)/(\d+)/index\.m3u8", path):
+            return self.send(request, 200, self.media_playlist().encode(), "application/vnd.apple.mpegurl")
+        if re.fullmatch(r"/hls/(\w+)/(\d+)/seg(\d+)\.ts", path):
+            return self.send(request, 200, self._segment[: self.segment_size], "video/mp2t", throttle=True)
+        if re.fullmatch(r"/subs/(\w+)\.vtt", path):
+            return self.send(request, 200, vtt_document(300).encode(), "text/vtt")
+        return self.send(request, 404, b"not found", "text/plain")
+
+    def search_page(self) -> str:
+        # the trending sidebar uses the same cards as the results
+        return (
+            '<div id="main-content"><div class="flw-item">'
+            f'<a class="film-poster-ahref item-qtip" href="/{ANIME_SLUG}"></a>'
+            f'<h3 class="film-name">{ANIME_NAME}</h3>'
+            f'<div class="tick-item tick-sub">{self.episodes}</div>'
+            f'<div class="tick-item tick-dub">{self.episodes}</div>'
+            "</div></div>"
+            '<div id="main-sidebar"><div class="flw-item">'
+            '<a class="film-poster-ahref item-qtip" href="/trending-anime-1"></a>'
+            '<h3 class="film-name">Trending Anime</h3>'
+            '<div class="tick-item tick-sub">24</div>'
+            "</div></div>"
+        )
+
+    def detail_page(self) -> str:
+        return (
+            '<div class="anisc-detail">'
+            f'<h2 class="film-name"><a href="/{ANIME_SLUG}">{ANIME_NAME}</a></h2>'
+            '<div class="film-stats">'
+            f'<div class="tick-item tick-sub">{self.episodes}</div>'
+            f'<div class="tick-item tick-dub">{self.episodes}</div>'
+            "</div></div>"
+        )
+
+    @staticmethod
+    def master_playlist() -> str:
+        lines = ["#EXTM3U"]
+        for height, bandwidth in VARIANTS:
+            lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={height * 16 // 9}x{height}")
+            lines.append(f"{height}/index.m3u8")
+        return "\n".join(lines) + "\n"
+
+    def media_playlist(self) -> str:
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:4", "#EXT-X-MEDIA-SEQUENCE:0"]
+        for i in range(self.segments):
+            lines.append("#EXTINF:4.000,")
+            lines.append(f"seg{i}.ts")
+        lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def send_json(self, request: BaseHTTPRequestHandler, data: dict) -> None:
+        self.send(request, 200, json.dumps(data).encode(), "application/json")
+
+    def send(
+        self,
+        request: BaseHTTPRequestHandler,
+        status: int,
+        body: bytes,
+        content_type: str,
+        throttle: bool = False,
+    ) -> None:
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        if request.command == "HEAD":
+            return
+        if not throttle or not self.bandwidth:
+            request.wfile.write(body)
+            return
+        # send in 16 KiB chunks paced to the configured bandwidth
+        chunk = 16 * 1024
+        for offset in range(0, len(body), chunk):
+            request.wfile.write(body[offset : offset + chunk])
+            time.sleep(min(chunk, len(body) - offset) / self.bandwidth)
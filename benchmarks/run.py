@@ -0,0 +1,283 @@
+"""
+Offline benchmarks against a local fake site and HLS origin.
+
+Runs the HTTP resolver and JSON replay paths of HianimeExtractor end to end, plus
+microbenchmarks of the hot helpers, and records the numbers so runs of two versions can be
+compared:
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from argparse import Namespace
+from typing import Any, Callable
+
+from bs4 import BeautifulSoup
+from colorama import Fore
+
+from benchmarks.fake_site import ANIME_NAME, ANIME_SLUG, FakeSite, series_page_html, vtt_document
+from extractors.hianime import HianimeExtractor
+from extractors.hianime_http import HianimeHttpResolver
+from tools.functions import vtt_to_srt
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "min": samples[0],
+        "mean": sum(samples) / len(samples),
+        "p50": samples[len(samples) // 2],
+        "max": samples[-1],
+    }
+
+
+def timed(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def make_args(output_dir: str, **overrides: Any) -> Namespace:
+    """The options main.py would pass, set up so a run never prompts."""
+    args = Namespace(
+        subtitles=True,
+        output_dir=output_dir,
+        filename="",
+        aria=False,
+        link=None,
+        server=None,
+        default_server=["HD-1", "HD-2"],
+        default_download_type="sub",
+        max_retries=0,
+        drivers=1,
+        resolver="http",
+        max_resolution=None,
+        max_bitrate=None,
+        downloader="native",
+        segment_workers=8,
+        max_downloads=4,
+        max_queued_downloads=2,
+        download_order="episode",
+        cache_dir=None,
+        progress_file=None,
+        metrics_file=None,
+        prometheus_file=None,
+        json_file=None,
+        download_all=True,
+        is_movie=False,
+        is_ova=False,
+        skip_existing=False,
+        srt_format=True,
+        convert_vtt=None,
+    )
+    vars(args).update(overrides)
+    return args
+
+
+def make_extractor(site: FakeSite, args: Namespace) -> HianimeExtractor:
+    extractor = HianimeExtractor(args=args)
+    extractor.URL = site.url
+    return extractor
+
+
+def folder_size(folder: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(folder) if entry.name.endswith(".mp4"))
+
+
+def clear_downloads(folder: str) -> None:
+    """Remove everything but the season json, so the next scenario downloads every episode again."""
+    for entry in os.scandir(folder):
+        if entry.is_file() and not entry.name.endswith(".json"):
+            os.remove(entry.path)
+
+
+def bench_http_path(site: FakeSite, output_dir: str, options: dict[str, Any]) -> dict[str, Any]:
+    """Series page -> episode list -> HTTP stream resolution -> downloads, as run() does."""
+    extractor = make_extractor(site, make_args(output_dir, **{**options, "resolver": "http"}))
+    started = time.perf_counter()
+    anime = extractor.get_anime_from_link(f"{site.url}/{ANIME_SLUG}")
+    anime.download_type = "sub"
+    anime.season_number = 1
+    folder = extractor.create_anime_folder(anime)
+
+    # returns once every episode is resolved and queued, the downloads keep running
+    episodes = extractor.download_series(anime, folder, 1, anime.sub_episodes) or []
+    resolved = time.perf_counter()
+    extractor.wait_for_downloads()
+    extractor.write_anime_json(folder, anime, episodes)
+    elapsed = time.perf_counter() - started
+    unresolved = [episode for episode in episodes if not episode.get("m3u8")]
+
+    size = folder_size(folder)
+    return {
+        "seconds": elapsed,
+        "resolve_seconds": resolved - started,
+        "episodes": len(episodes),
+        "unresolved": len(unresolved),
+        "bytes": size,
+        "bytes_per_second": size / elapsed,
+    }
+
+
+def bench_json_replay(site: FakeSite, output_dir: str, options: dict[str, Any]) -> dict[str, Any]:
+    """Downloads every episode again from the season json written by the HTTP path."""
+    json_file = f"{ANIME_NAME} (Season 1).json"
+    extractor = make_extractor(site, make_args(output_dir, json_file=json_file, **options))
+    started = time.perf_counter()
+    anime = extractor.get_anime_from_link(f"{site.url}/{ANIME_SLUG}")
+    anime.download_type = "sub"
+    anime.season_number = 1
+    folder = extractor.create_anime_folder(anime)
+    # yt-dlp would otherwise skip the files the HTTP path already wrote and measure nothing
+    clear_downloads(folder)
+    extractor.download_from_json(anime, json_file, folder, 1, anime.sub_episodes)
+    elapsed = time.perf_counter() - started
+
+    size = folder_size(folder)
+    return {"seconds": elapsed, "bytes": size, "bytes_per_second": size / elapsed}
+
+
+def bench_micro(site: FakeSite, output_dir: str, repeat: int) -> dict[str, Any]:
+    extractor = make_extractor(site, make_args(output_dir))
+    results: dict[str, Any] = {}
+
+    results["fetch_search_page"] = timed(lambda: extractor.fetch_search_page("bench"), repeat)
+
+    page = series_page_html(1000)
+    results["get_episode_urls (1000 episodes)"] = timed(lambda: extractor.get_episode_urls(page, 1, 1000), repeat)
+    # the full tree parse get_episode_urls used before, kept as a reference point
+    results["BeautifulSoup a[data-number] (1000 episodes)"] = timed(
+        lambda: BeautifulSoup(page, "html.parser").find_all("a", attrs={"data-number": True}), repeat
+    )
+
+    resolver = HianimeHttpResolver(site.url, extractor.HEADERS, extractor.session)
+    anime_url = f"{site.url}/watch/{ANIME_SLUG}"
+    results["get_episode_urls (http)"] = timed(lambda: resolver.get_episode_urls(anime_url, 1, site.episodes), repeat)
+
+    master = f"{site.url}/hls/1001/master.m3u8"
+
+    def look_for_variants_cold() -> None:
+        extractor._master_playlists.clear()
+        extractor.look_for_variants(master, {})
+
+    results["look_for_variants"] = timed(look_for_variants_cold, repeat)
+    results["look_for_variants (cached)"] = timed(lambda: extractor.look_for_variants(master, {}), repeat)
+
+    vtt_path = os.path.join(output_dir, "bench.vtt")
+    with open(vtt_path, "w", encoding="utf-8") as f:
+        f.write(vtt_document(5000))
+    results["vtt_to_srt (5000 cues)"] = timed(lambda: vtt_to_srt(vtt_path), repeat)
+    return results
+
+
+def git_version() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Print the change of every timing that both runs have, negative is faster."""
+    print(f"\n{Fore.LIGHTGREEN_EX}Compared with {baseline.get('version')}:")
+    for name, current in results["micro"].items():
+        previous = baseline.get("micro", {}).get(name)
+        if previous:
+            change = (current["mean"] - previous["mean"]) / previous["mean"] * 100
+            print(f" {name}: {previous['mean'] * 1000:.2f}ms -> {current['mean'] * 1000:.2f}ms ({change:+.1f}%)")
+    for name, current in results["end_to_end"].items():
+        previous = baseline.get("end_to_end", {}).get(name)
+        if previous:
+            change = (current["seconds"] - previous["seconds"]) / previous["seconds"] * 100
+            print(f" {name}: {previous['seconds']:.2f}s -> {current['seconds']:.2f}s ({change:+.1f}%)")
+
+
+def parse_args() -> Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a fake site")
+    parser.add_argument("--episodes", type=int, default=12, help="Episodes in the fake series")
+    parser.add_argument("--segments", type=int, default=10, help="HLS segments per episode")
+    parser.add_argument("--segment-size", type=int, default=256 * 1024, help="Bytes per HLS segment")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds added to every response")
+    parser.add_argument("--bandwidth", type=int, default=None, help="Segment bandwidth in bytes per second per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of HLS requests answered with a 503")
+    parser.add_argument("--downloader", choices=["yt-dlp", "native"], default="native", help="Download backend")
+    parser.add_argument("--max-downloads", type=int, default=4, help="Concurrent episode downloads")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per microbenchmark")
+    parser.add_argument("--skip-end-to-end", action="store_true", help="Only run the microbenchmarks")
+    parser.add_argument("--output", type=str, default=None, help="Write the results to this JSON file")
+    parser.add_argument("--compare", type=str, default=None, help="Results JSON of an earlier run to compare with")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    site = FakeSite(
+        episodes=args.episodes,
+        segments=args.segments,
+        segment_size=args.segment_size,
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+    )
+    options = {"downloader": args.downloader, "max_downloads": args.max_downloads}
+    results: dict[str, Any] = {
+        "version": git_version(),
+        "time": time.time(),
+        "python": platform.python_version(),
+        "site": {
+            "episodes": args.episodes,
+            "segments": args.segments,
+            "segment_size": args.segment_size,
+            "latency": args.latency,
+            "bandwidth": args.bandwidth,
+            "error_rate": args.error_rate,
+        },
+        "options": options,
+        "end_to_end": {},
+    }
+
+    with site, tempfile.TemporaryDirectory(prefix="hianime-bench-") as output_dir:
+        if not args.skip_end_to_end:
+            results["end_to_end"]["http"] = bench_http_path(site, output_dir, options)
+            results["end_to_end"]["json_replay"] = bench_json_replay(site, output_dir, options)
+        results["micro"] = bench_micro(site, output_dir, args.repeat)
+        results["site"]["requests"] = site.requests
+        results["site"]["errors"] = site.errors
+
+    print(f"\n{Fore.LIGHTGREEN_EX}End to end:")
+    for name, result in results["end_to_end"].items():
+        print(
+            f" {name}: {result['seconds']:.2f}s, "
+            f"{result['bytes'] / 1024 / 1024 / result['seconds']:.1f} MiB/s"
+        )
+    print(f"\n{Fore.LIGHTGREEN_EX}Microbenchmarks (mean / p50 / max):")
+    for name, result in results["micro"].items():
+        print(f" {name}: {result['mean'] * 1000:.2f}ms / {result['p50'] * 1000:.2f}ms / {result['max'] * 1000:.2f}ms")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"\n{Fore.LIGHTGREEN_EX}Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
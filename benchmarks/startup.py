@@ -0,0 +1,73 @@
+"""
+CLI startup benchmark based on `python -X importtime`.
+
+Measures the imports needed to start main.py and pick the extractor for a link, so the cost
+of pulling in heavy dependencies shows up per extractor:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --link https://www.instagram.com/p/abc/ --top 15
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+from colorama import Fore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(link: str) -> tuple[float, dict[str, int]]:
+    """
+    Import main and resolve `link` to its extractor class in a fresh interpreter.
+
+    Returns the wall time in seconds and the cumulative import time in microseconds of
+    every top-level import.
+    """
+    code = f"import main; main.find_extractor({link!r})"
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    top_level: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        # nested imports are indented by two spaces per level below the first
+        if match and len(match.group(3)) == 1:
+            top_level[match.group(4)] = int(match.group(2))
+    return elapsed, top_level
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument("--link", type=str, default="https://example.com/video.mp4", help="Link to pick an extractor for")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    runs = [measure(args.link) for _ in range(args.repeat)]
+    walls = sorted(wall for wall, _ in runs)
+    # the last run has the warmest file cache, the closest to an everyday start
+    imports = runs[-1][1]
+
+    print(f"{Fore.LIGHTGREEN_EX}Startup for {args.link}:")
+    print(f" wall time (p50 of {args.repeat}): {walls[len(walls) // 2] * 1000:.1f}ms")
+    print(f" total import time: {sum(imports.values()) / 1000:.1f}ms over {len(imports)} top-level imports")
+    print(f"\n{Fore.LIGHTGREEN_EX}Slowest top-level imports:")
+    for module, micros in sorted(imports.items(), key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f" {micros / 1000:8.1f}ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from asyncio import threads
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 import json
 import os
@@ -7,14 +8,13 @@ import threading
 import time
 from argparse import Namespace
 from dataclasses import asdict, dataclass
-from glob import glob
-from typing import Any
+from glob import escape, glob
+from typing import Any, Callable, Hashable
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 from colorama import Fore
-from langdetect import detect as detect_lang
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
@@ -23,7 +23,29 @@ from selenium_stealth import stealth
 from seleniumwire import webdriver
 from yt_dlp import YoutubeDL
 
-from tools.functions import get_confirmation, get_int_in_range, safe_remove, vtt_to_srt
+from extractors.hianime_http import HianimeHttpResolver
+from tools.catalog_cache import CatalogCache
+from tools.download_scheduler import DownloadScheduler
+from tools.driver_pool import DriverPool
+from tools.episode_index import EpisodeIndex, parse_episode_links
+from tools.functions import (
+    get_confirmation,
+    get_int_in_range,
+    iter_srt_cues,
+    playlist_duration,
+    probe_duration,
+    write_atomic,
+)
+from tools.hls import MasterPlaylist, parse_master, parse_media, select_variant
+from tools.hls_downloader import HlsDownloader
+from tools.jikan import JikanClient
+from tools.metrics import get_metrics, process_tree_rss
+from tools.progress import ProgressAggregator
+from tools.rate_controller import HostRateController, shared_rate_controller
+from tools.request_scanner import RequestScanner, purge_requests
+from tools.session import HEADERS, get_session
+from tools.stream_cache import StreamCache, infer_expiry
+from tools.subtitle_classifier import SubtitleClassifier
 # from tools.YTDLogger import YTDLogger
 
 
@@ -49,6 +71,29 @@ class SilentLogger:
     def info(self, msg):
         pass
 
+class RateControlLogger(SilentLogger):
+    """
+    Silent yt-dlp logger that reports throttling errors to the shared rate controller.
+
+    `url` is moved along to the fragment being fetched, so errors count against its host.
+    """
+    THROTTLE_MESSAGES: tuple[str, ...] = ("HTTP Error 429", "HTTP Error 5", "fragment not found")
+
+    def __init__(self, controller: HostRateController, url: str):
+        self.controller = controller
+        self.url = url
+
+    def _check(self, msg):
+        if any(message in msg for message in self.THROTTLE_MESSAGES):
+            self.controller.failure(self.url)
+
+    def debug(self, msg):
+        self._check(msg)
+    def warning(self, msg):
+        self._check(msg)
+    def error(self, msg):
+        self._check(msg)
+
 class HianimeExtractor:
     def __init__(self, args: Namespace, name: str | None = None) -> None:
         self.args: Namespace = args
@@ -56,14 +101,9 @@ class HianimeExtractor:
         self.link = self.args.link
         self.name = name
 
-        self.HEADERS: dict[str, str] = {
-            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like Gecko) Chrome/23.0.1271.64 Safari/537.11",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Charset": "ISO-8859-1,utf-8;q=0.7,*;q=0.3",
-            "Accept-Encoding": "none",
-            "Accept-Language": "en-US,en;q=0.8",
-            "Connection": "keep-alive",
-        }
+        self.HEADERS: dict[str, str] = dict(HEADERS)
+        self.session = get_session()
+        self.metrics = get_metrics()
         self.URL: str = "https://hianime.to"
         self.ENCODING = "utf-8"
         self.SUBTITLE_LANG: str = "en"
@@ -110,8 +150,11 @@ class HianimeExtractor:
             "slo",
             "ukr",
         ]
+        self.MIN_EPISODE_SIZE: int = 1024 * 1024
         self.DOWNLOAD_REFRESH: tuple[int, int, int] = (15, 30, 45)
         self.SERVER_REFRESH: tuple[int, int, int] = (7, 22, 37, 52)
+        # selenium-wire request scopes, the capture only looks at playlists and subtitles
+        self.CAPTURE_SCOPES: list[str] = [r"(?i)\.m3u8", r"(?i)\.vtt"]
         self.BAD_TITLE_CHARS: list[str] = [
             "-",
             ".",
@@ -132,8 +175,44 @@ class HianimeExtractor:
             "", "", "".join(self.BAD_TITLE_CHARS)
         )
 
-        self.download_progress = {}  # Maps episode name to progress info (ETA)
-        self._progress_lock = threading.Lock()
+        self._capture_lock = threading.Lock()
+        self._prompt_lock = threading.Lock()
+        # batch runs never prompt, ambiguous choices fall back to the first option
+        self.unattended: bool = False
+        # kept open between series when set, see capture_episodes_with_browser
+        self.keep_browser: bool = False
+        self.driver_pool: DriverPool | None = None
+        # downloads are queued under this group, so a batch job can cancel only its own
+        self.download_group: Hashable | None = None
+        self.server_selection: str | None = self.args.server
+        self.captured_video_urls: set[str] = set()
+        self.captured_subtitle_urls: set[str] = set()
+        self.subtitle_classifier = SubtitleClassifier(self.ENCODING, session=self.session)
+        cache_dir = getattr(self.args, "cache_dir", None)
+        self.stream_cache: StreamCache | None = (
+            StreamCache(os.path.join(cache_dir, "streams.sqlite")) if cache_dir else None
+        )
+        self.episode_index: EpisodeIndex | None = (
+            EpisodeIndex(os.path.join(cache_dir, "episodes.sqlite")) if cache_dir else None
+        )
+        self.catalog_cache: CatalogCache | None = (
+            CatalogCache(os.path.join(cache_dir, "catalog.sqlite")) if cache_dir else None
+        )
+        self.jikan = JikanClient(os.path.join(cache_dir, "metadata.sqlite") if cache_dir else None)
+        self.rate_controller = shared_rate_controller()
+        self.hls_downloader = HlsDownloader(
+            getattr(self.args, "segment_workers", 8), rate_controller=self.rate_controller
+        )
+        self._master_playlists: dict[str, MasterPlaylist] = {}
+        self._playlist_lock = threading.Lock()
+        self.downloads = DownloadScheduler(
+            getattr(self.args, "max_downloads", 4),
+            getattr(self.args, "download_order", "episode"),
+            getattr(self.args, "max_queued_downloads", 2),
+        )
+        self.progress = ProgressAggregator(
+            getattr(self.args, "progress_file", None), queued=lambda: self.downloads.pending
+        )
 
     def run(self):
         # Determine how to get the Anime object:
@@ -217,10 +296,10 @@ class HianimeExtractor:
             anime.year = self.get_anime_year(anime.name)
             if not anime.year:
                 anime.year = get_int_in_range(
-                    f"{Fore.LIGHTCYAN_EX}Enter the movie release year (e.g., {datetime.datetime.now().year}):{Fore.LIGHTYELLOW_EX} ",
-                    datetime.datetime.now().year - 150,
-                    datetime.datetime.now().year + 1,
-                    datetime.datetime.now().year
+                    f"{Fore.LIGHTCYAN_EX}Enter the movie release year (e.g., {datetime.now().year}):{Fore.LIGHTYELLOW_EX} ",
+                    datetime.now().year - 150,
+                    datetime.now().year + 1,
+                    datetime.now().year
                 )
             anime.name += f" ({anime.year})"
 
@@ -240,92 +319,224 @@ class HianimeExtractor:
             self.download_from_json(anime, self.args.json_file, folder, start_ep, end_ep)
             return
 
-        self.configure_driver()
-        self.driver.get(anime.url)
-        button: WebElement = self.find_server_button(anime)  # type: ignore
+        episode_list = self.download_series(anime, folder, start_ep, end_ep)
+        if episode_list is None:
+            return
 
-        try:
-            button.click()
-        except Exception as e:
-            print(
-                f"{Fore.LIGHTRED_EX}Error clicking server button:\n\n{Fore.LIGHTWHITE_EX}{e}"
+        self.wait_for_downloads()
+
+        self.write_anime_json(folder, anime, episode_list)
+
+    def close(self) -> None:
+        """Quit the kept browsers and release the classifier threads and cache databases."""
+        if self.driver_pool:
+            self.driver_pool.close()
+            self.driver_pool = None
+        self.subtitle_classifier.close()
+        for cache in (self.stream_cache, self.episode_index, self.catalog_cache):
+            if cache:
+                cache.close()
+        self.jikan.close()
+
+    def download_series(
+        self, anime: Anime, folder: str, start_ep: int, end_ep: int
+    ) -> list[dict[str, Any]] | None:
+        """
+        Resolve the streams of episodes `start_ep` - `end_ep` and queue their downloads.
+
+        Returns without waiting for the downloads. Returns the episode list, or None if the
+        user cancelled the capture, in which case the downloads of `download_group` are
+        cancelled too.
+        """
+        self.captured_video_urls = set()
+        self.captured_subtitle_urls = set()
+
+        def start_download(episode: dict[str, Any]) -> None:
+            # Have episode URL now, so queue it for download. Blocks while the download queue
+            # is full, which pauses capture until the downloads catch up.
+            self.downloads.submit(
+                self.download_episode, anime, episode, folder, priority=episode["number"], group=self.download_group
             )
 
-        episode_list: list[dict] = self.get_episode_urls(
-            self.driver.page_source, start_ep, end_ep
-        )
+        def on_resolved(episode: dict[str, Any]) -> None:
+            if self.stream_cache:
+                self.stream_cache.put(episode["url"], episode.get("server") or "", anime.download_type, episode)
+            start_download(episode)
 
-        print()
+        resolver = HianimeHttpResolver(self.URL, self.HEADERS, self.session)
+        pending: list[dict] | None = None
+        # episodes already indexed by an earlier run need neither the page nor the AJAX list
+        episode_list: list[dict] | None = (
+            self.episode_index.get(anime.url, start_ep, end_ep) or None if self.episode_index else None
+        )
+        if episode_list is None and (self.stream_cache or self.args.resolver == "http"):
+            # the episode list is a single AJAX call, so cached episodes never need the browser
+            all_episodes = resolver.get_episode_urls(anime.url, 1, sys.maxsize)
+            if all_episodes and self.episode_index:
+                self.episode_index.put(anime.url, all_episodes)
+            episode_list = [
+                episode for episode in all_episodes or [] if start_ep <= episode["number"] <= end_ep
+            ] or None
+            if episode_list is None:
+                print(f"{Fore.LIGHTYELLOW_EX}Could not fetch the episode list over HTTP, using the browser instead\n")
+
+        if episode_list is not None:
+            pending = self.skip_downloaded(anime, folder, episode_list)
+            pending = self.resolve_episodes_from_cache(anime, pending, start_download)
+            if pending and self.args.resolver == "http":
+                pending = self.resolve_episodes_over_http(anime, resolver, pending, on_resolved)
+            if pending:
+                print(f"{Fore.LIGHTYELLOW_EX}Using the browser for {len(pending)} episode(s)\n")
+
+        if episode_list is None or pending:
+            captured = self.capture_episodes_with_browser(anime, folder, start_ep, end_ep, pending, on_resolved)
+            if captured is None:
+                self.downloads.cancel(self.download_group)
+                return None
+            if episode_list is None:
+                episode_list = captured
+        return episode_list
+
+
+    def preferred_servers(self) -> list[str]:
+        """
+        Server names stream cache entries may come from: the server chosen for this run once
+        there is one, otherwise --server and the default_server config in priority order.
+        """
+        if self.server_selection:
+            return [self.server_selection]
+        server_names = [self.args.server] if self.args.server else []
+        if self.args.default_server:
+            server_names += self.args.default_server if isinstance(self.args.default_server, list) else [self.args.default_server]
+        return server_names
+
+    def resolve_episodes_from_cache(
+        self, anime: Anime, episode_list: list[dict[str, Any]], on_resolved: Callable[[dict[str, Any]], None]
+    ) -> list[dict[str, Any]]:
+        """Queue every episode with a fresh stream cache entry, returns the episodes still to resolve."""
+        if not self.stream_cache:
+            return list(episode_list)
 
-        self.captured_video_urls = []
-        self.captured_subtitle_urls = []
-        threads = []
+        pending: list[dict[str, Any]] = []
         for episode in episode_list:
-            url = episode["url"]
-            number = episode["number"]
-            title = episode["title"]
-
+            cached = self.stream_cache.get(episode["url"], anime.download_type, self.preferred_servers())
+            if not cached:
+                pending.append(episode)
+                continue
             print(
                 Fore.LIGHTGREEN_EX
-                + "Getting"
+                + "Cached"
                 + Fore.LIGHTWHITE_EX
-                + f" Episode {number} - {title} from {url}"
+                + f" Episode {episode['number']} - {episode['title']}"
+            )
+            if not self.args.subtitles:
+                cached.pop("vtt", None)
+            episode.update(cached)
+            on_resolved(episode)
+        return pending
+
+    def resolve_episodes_over_http(
+        self,
+        anime: Anime,
+        resolver: HianimeHttpResolver,
+        episode_list: list[dict[str, Any]],
+        on_resolved: Callable[[dict[str, Any]], None],
+    ) -> list[dict[str, Any]]:
+        """Resolve episode streams without a browser, returns the episodes that could not be resolved."""
+        pending: list[dict[str, Any]] = []
+        for episode in episode_list:
+            print(
+                Fore.LIGHTGREEN_EX
+                + "Resolving"
                 + Fore.LIGHTWHITE_EX
+                + f" Episode {episode['number']} - {episode['title']} over HTTP"
+            )
+            media_requests = resolver.resolve(episode, anime.download_type, self.preferred_servers())
+            if not media_requests:
+                pending.append(episode)
+                continue
+            if not self.args.subtitles:
+                media_requests.pop("vtt", None)
+            episode.update(media_requests)
+            on_resolved(episode)
+        return pending
+
+    def capture_episodes_with_browser(
+        self,
+        anime: Anime,
+        folder: str,
+        start_ep: int,
+        end_ep: int,
+        episode_list: list[dict[str, Any]] | None,
+        on_captured: Callable[[dict[str, Any]], None],
+    ) -> list[dict[str, Any]] | None:
+        """
+        Capture episode streams through a pool of browser drivers.
+
+        When `episode_list` is None the episodes are read from the series page. Returns the
+        episode list, or None if the user cancelled the run.
+        """
+        pool = self.driver_pool
+        if pool is None or not pool.drivers:
+            self.configure_driver()
+            pool = DriverPool(
+                lambda: self.create_worker_driver(anime),
+                getattr(self.args, "drivers", 1),
+                drivers=[self.driver],
             )
+        else:
+            # reuse the browsers of the previous series, extra drivers open this series
+            self.driver = pool.drivers[0]
+            pool.factory = lambda: self.create_worker_driver(anime)
+        self.load_page(self.driver, anime.url)
+        button: WebElement = self.find_server_button(anime)  # type: ignore
 
-            try:
-                self.driver.requests.clear()
-                self.driver.get(url)
-                self.driver.execute_script("window.focus();")
-                media_requests = self.capture_media_requests(anime)
-                if not media_requests:
-                    print("No m3u8 file was found skipping download")
-                    continue
-                
-                episode.update(media_requests)
-                self.captured_video_urls.append(media_requests["m3u8"])
-                if self.args.subtitles:
-                    self.captured_subtitle_urls.append(media_requests["vtt"])
+        try:
+            button.click()
+        except Exception as e:
+            print(
+                f"{Fore.LIGHTRED_EX}Error clicking server button:\n\n{Fore.LIGHTWHITE_EX}{e}"
+            )
 
-                # Have episode URL now, so kick off thread to download it
-                t = threading.Thread(target=self.download_episode, args=(anime, episode, folder), daemon=True)
-                t.start()
-                threads.append(t)
-            except KeyboardInterrupt:
-                print("\n\nCanceling media capture...")
-                if not get_confirmation(
-                    "Would you like to download link capture up to now? (y/n): "
-                ):
-                    self.driver.quit()
-                    return
+        to_capture = episode_list
+        if episode_list is None:
+            all_episodes = self.get_episode_urls(self.driver.page_source, 1, sys.maxsize)
+            if all_episodes and self.episode_index:
+                self.episode_index.put(anime.url, all_episodes)
+            episode_list = [episode for episode in all_episodes if start_ep <= episode["number"] <= end_ep]
+            to_capture = self.skip_downloaded(anime, folder, episode_list)
 
-        self.driver.quit()
         print()
 
-        print(f"\n{Fore.LIGHTGREEN_EX}Waiting for all downloads to complete...\n")
-        while threads:
-            max_eta = 0
-            with self._progress_lock:
-                for ep_name, prog in self.download_progress.items():
-                    eta = prog.get("eta")
-                    if eta is not None:
-                        max_eta = max(max_eta, eta)
-            for t in threads[:]:
-                if not t.is_alive():
-                    t.join()
-                    threads.remove(t)
-            alive_count = len(threads)
-            eta_min = int(max_eta // 60)
-            eta_sec = int(max_eta % 60)
-            eta_str = f"{eta_min}m {eta_sec}s"
-            print(f"{Fore.LIGHTCYAN_EX}Downloads in progress: {alive_count}, Max Episode ETA: {eta_str}".ljust(80), end="\r")
-            if alive_count == 0:
-                break
-            time.sleep(10)
-        print(f"\n\n{Fore.LIGHTGREEN_EX}All downloads completed!\n")
-        
-        self.write_anime_json(folder, anime, episode_list)
+        def capture(driver: webdriver.Chrome, episode: dict[str, Any]) -> dict[str, Any] | None:
+            media_requests = self.capture_episode(driver, anime, episode)
+            if media_requests:
+                on_captured(episode)
+            return media_requests
+
+        if pool.size > len(pool.drivers) and len(to_capture) > 1:
+            print(f"{Fore.LIGHTGREEN_EX}Launching {pool.size - len(pool.drivers)} additional browser(s) for capture...\n")
+            pool.start()
 
+        stop = threading.Event()
+        try:
+            pool.map(capture, to_capture, stop)
+        except KeyboardInterrupt:
+            # map only re-raises once the running captures stopped, so no driver is still in use here
+            print("\n\nCanceling media capture...")
+            if not get_confirmation(
+                "Would you like to download link capture up to now? (y/n): "
+            ):
+                pool.close()
+                self.driver_pool = None
+                return None
+
+        if self.keep_browser:
+            self.driver_pool = pool
+        else:
+            pool.close()
+        print()
+        return episode_list
 
     #function to create anime folder for storing downloads
     def create_anime_folder(self, anime: Anime) -> str:
@@ -364,89 +575,207 @@ class HianimeExtractor:
         with open(f"{folder}{json_file}", "r") as file:
             episodes = json.load(file)["episodes"]
 
-        threads = []
-        for episode in episodes:
-            if episode["number"] < start_ep or episode["number"] > end_ep:
-                continue
-            print(f"\nDownloading Episode {episode['number']} - {episode['title']}")
+        try:
+            for episode in episodes:
+                if episode["number"] < start_ep or episode["number"] > end_ep:
+                    continue
+                if self.args.skip_existing and self.is_downloaded(f"{folder}{self.episode_filename(anime, episode)}.mp4", episode):
+                    print(f"{Fore.LIGHTGREEN_EX}Already downloaded{Fore.LIGHTWHITE_EX} Episode {episode['number']} - {episode['title']}")
+                    continue
+                # prefer links captured since the json was written
+                cached = self.stream_cache.get(episode["url"], anime.download_type, self.preferred_servers()) if self.stream_cache else None
+                if cached:
+                    episode.update(cached)
+                elif episode.get("m3u8") and (infer_expiry(episode["m3u8"]) or float("inf")) < time.time():
+                    print(f"{Fore.LIGHTYELLOW_EX}The stream link for Episode {episode['number']} has expired, the download may fail")
+                print(f"\nQueueing Episode {episode['number']} - {episode['title']}")
+                self.downloads.submit(self.download_episode, anime, episode, folder, priority=episode["number"])
+        except KeyboardInterrupt:
+            print(f"\n\n{Fore.LIGHTCYAN_EX}Canceling Downloads...")
+            self.downloads.cancel()
+            self.downloads.wait()
+            return
+
+        self.wait_for_downloads()
 
-            t = threading.Thread(target=self.download_episode, args=(anime, episode, folder), daemon=True)
-            t.start()
-            threads.append(t)
 
+    def wait_for_downloads(self) -> None:
+        """Block until the download queue is empty, Ctrl-C cancels queued and running downloads."""
         print(f"\n{Fore.LIGHTGREEN_EX}Waiting for all downloads to complete...\n")
-        while threads:
-            max_eta = 0
-            with self._progress_lock:
-                for ep_name, prog in self.download_progress.items():
-                    eta = prog.get("eta")
-                    if eta is not None:
-                        max_eta = max(max_eta, eta)
-            for t in threads[:]:
-                if not t.is_alive():
-                    t.join()
-                    threads.remove(t)
-            alive_count = len(threads)
-            eta_min = int(max_eta // 60)
-            eta_sec = int(max_eta % 60)
-            eta_str = f"{eta_min}m {eta_sec}s"
-            print(f"{Fore.LIGHTCYAN_EX}Download threads still running: {alive_count}, Max Episode ETA: {eta_str}".ljust(80), end="\r")
-            if alive_count == 0:
-                break
-            time.sleep(10)
+        try:
+            while True:
+                print(f"{Fore.LIGHTCYAN_EX}{self.progress.format_line()}".ljust(100), end="\r")
+                if self.downloads.wait(1):
+                    break
+        except KeyboardInterrupt:
+            print(f"\n\n{Fore.LIGHTCYAN_EX}Canceling Downloads...")
+            self.downloads.cancel()
+            self.downloads.wait()
+            return
+        self.progress.write_jsonl()
         print(f"\n\n{Fore.LIGHTGREEN_EX}All downloads completed!\n")
 
-
-
-    #function to download a single episode, used in a thread
-    def download_episode(self, anime: Anime, episode: dict[str, Any], folder: str) -> None:
-
+    def episode_filename(self, anime: Anime, episode: dict[str, Any]) -> str:
+        """File name (without extension) an episode is saved under."""
         # episode titles may have bad characters so we need to sanitize them
         title = episode["title"].translate(self.TITLE_TRANS)
         if self.args.is_movie:
-            name = f"{title} (Movie)"
-        elif self.args.is_ova:
+            return f"{title} (Movie)"
+        if self.args.is_ova:
             # OVA tends to be special episodes outside of the main season, so using season 0
-            name = f"s{anime.season_number:02}e{(episode['number'])+anime.episode_offset:02} - {title} (OVA)"
-        else:
-            name = f"s{anime.season_number:02}e{episode['number']:02} - {title}"
-        if "m3u8" not in episode.keys() and not episode["m3u8"]:
+            return f"s{anime.season_number:02}e{(episode['number'])+anime.episode_offset:02} - {title} (OVA)"
+        return f"s{anime.season_number:02}e{episode['number']:02} - {title}"
+
+    def read_anime_json(self, folder: str, anime: Anime) -> dict[int, dict[str, Any]]:
+        """Episodes from a previous run's json file keyed by episode number, empty if there is none."""
+        try:
+            with open(f"{folder}{anime.name} (Season {anime.season_number}).json", "r") as json_file:
+                return {episode["number"]: episode for episode in json.load(json_file)["episodes"]}
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            return {}
+
+    def is_downloaded(self, path: str, previous: dict[str, Any] | None = None) -> bool:
+        """
+        Check that a finished episode file exists and looks complete.
+
+        Leftover part files mean the download was interrupted. The file has to match the size
+        or playlist duration recorded by a previous run, without either it can't be verified
+        before capture and `download_episode` checks it against the playlist instead.
+        """
+        if not os.path.isfile(path) or glob(escape(path) + ".*"):
+            return False
+        size = os.path.getsize(path)
+        if size < self.MIN_EPISODE_SIZE:
+            return False
+        if not previous or not (previous.get("filesize") or previous.get("duration")):
+            return False
+        if previous.get("filesize") and size < previous["filesize"] * 0.99:
+            return False
+        if previous.get("duration"):
+            duration = probe_duration(path)
+            if duration is not None and duration < previous["duration"] - max(5, previous["duration"] * 0.02):
+                return False
+        if self.args.subtitles and previous.get("vtt"):
+            base = path[:-4]
+            if not os.path.exists(base + ".vtt") and not os.path.exists(base + ".srt"):
+                return False
+        return True
+
+    def matches_duration(self, path: str, duration: float | None) -> bool:
+        """Whether a finished file exists at `path` and plays for the expected `duration`."""
+        if not duration or not os.path.isfile(path) or glob(escape(path) + ".*"):
+            return False
+        probed = probe_duration(path)
+        return probed is not None and abs(probed - duration) <= max(5, duration * 0.02)
+
+    def skip_downloaded(self, anime: Anime, folder: str, episode_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Returns the episodes that still need downloading, complete ones keep their previous json data."""
+        if not self.args.skip_existing:
+            return list(episode_list)
+
+        previous = self.read_anime_json(folder, anime)
+        remaining: list[dict[str, Any]] = []
+        for episode in episode_list:
+            name = self.episode_filename(anime, episode)
+            earlier = previous.get(episode["number"])
+            if self.is_downloaded(f"{folder}{name}.mp4", earlier):
+                print(f"{Fore.LIGHTGREEN_EX}Already downloaded{Fore.LIGHTWHITE_EX} {name}")
+                if earlier:
+                    episode.update({**earlier, **episode})
+                continue
+            remaining.append(episode)
+        return remaining
+
+    #function to download a single episode, used in a thread
+    def download_episode(self, anime: Anime, episode: dict[str, Any], folder: str) -> None:
+        name = self.episode_filename(anime, episode)
+        if "m3u8" not in episode.keys() or not episode["m3u8"]:
             print(f"Skipping {name} (No M3U8 Stream Found)")
             return
 
+        location = f"{folder}{name}.mp4"
+        download_started = time.perf_counter()
+        already_downloaded = False
         try:
-            result = self.yt_dlp_download(
-                self.look_for_variants(episode["m3u8"], episode["headers"]),
-                episode["headers"],
-                f"{folder}{name}.mp4",
-                episode_name=name
-            )
+            variant = self.look_for_variants(episode["m3u8"], episode["headers"])
+            playlist = None
+            try:
+                # recorded so later runs can tell a complete file from a truncated one
+                response = self.session.get(variant, headers=episode["headers"])
+                response.raise_for_status()
+                playlist = response.text
+                episode["duration"] = playlist_duration(playlist)
+            except requests.RequestException:
+                pass
+            if self.args.skip_existing and self.matches_duration(location, episode.get("duration")):
+                # a file from a run that left no json entry, complete according to the playlist
+                print(f"{Fore.LIGHTGREEN_EX}Already downloaded{Fore.LIGHTWHITE_EX} {name}")
+                result = already_downloaded = True
+            elif self.args.downloader == "native":
+                result = self.hls_downloader.download(
+                    variant,
+                    location,
+                    episode["headers"],
+                    [self.progress_hook(name)],
+                    playlist,
+                )
+            else:
+                result = self.yt_dlp_download(
+                    variant,
+                    episode["headers"],
+                    location,
+                    episode_name=name,
+                    playlist=playlist,
+                )
         except Exception as e:
+            self.progress.update(name, {"status": "error"})
+            self.metrics.count("downloads_failed")
             print(f"\n\n{Fore.LIGHTRED_EX}Error while downloading {name}: \n\n{e}")
             return
         
         if not result:
+            self.progress.update(name, {"status": "error"})
+            self.metrics.count("downloads_failed")
             print(f"Failed to download {name}, skipping subtitles if any")
             return
+        if os.path.isfile(location):
+            episode["filesize"] = os.path.getsize(location)
+        if not already_downloaded:
+            self.metrics.record("download", time.perf_counter() - download_started)
+            self.metrics.count("downloads_finished")
+            self.metrics.count("download_bytes", episode.get("filesize", 0))
 
         if "vtt" in episode.keys() and episode["vtt"]:
-            vtt_path = f"{folder}{name}.vtt"
-            self.yt_dlp_download(
-                episode["vtt"], episode["headers"], vtt_path
-            )
-            
-            # Convert to SRT if requested
-            if self.args.srt_format:
-                try:
-                    srt_path = vtt_to_srt(vtt_path)
-                    safe_remove(vtt_path)  # Remove VTT file after conversion
-                    print(f"{Fore.LIGHTGREEN_EX}Converted to {os.path.basename(srt_path)}")
-                except Exception as e:
-                    print(f"{Fore.LIGHTRED_EX}Error converting {name}.vtt to SRT: {e}")
+            try:
+                subtitle_path = self.download_subtitles(episode["vtt"], episode["headers"], f"{folder}{name}")
+                if self.args.srt_format:
+                    print(f"{Fore.LIGHTGREEN_EX}Converted to {os.path.basename(subtitle_path)}")
+            except Exception as e:
+                print(f"{Fore.LIGHTRED_EX}Error downloading subtitles for {name}: {e}")
         elif self.args.subtitles:
             print(f"Skipping {name}.vtt (No VTT Stream Found)")
 
 
+    def download_subtitles(self, url: str, headers: dict[str, str], base_path: str) -> str:
+        """
+        Fetch a subtitle file into memory and write it once in the final format.
+
+        Returns the path of the written .vtt, or .srt when srt_format is set.
+        """
+        with self.metrics.time("subtitle_fetch"):
+            response = self.session.get(url, headers=headers)
+            response.raise_for_status()
+        text = response.content.decode(self.ENCODING, errors="replace")
+
+        if self.args.srt_format:
+            path = f"{base_path}.srt"
+            with self.metrics.time("subtitle_convert"):
+                write_atomic(path, iter_srt_cues(text.splitlines()))
+        else:
+            path = f"{base_path}.vtt"
+            write_atomic(path, [text])
+        return path
+
     @staticmethod
     def get_download_type():
         ans = (
@@ -467,26 +796,13 @@ class HianimeExtractor:
     
     def get_anime_year(self, title: str) -> str | None:
         """Look up the release year of an anime/movie using Jikan (MyAnimeList) API."""
-        url = f"https://api.jikan.moe/v4/anime"
-        params = {"q": title, "limit": 1}
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            results = data.get("data", [])
-            if results:
-                aired_from = results[0].get("aired", {}).get("from")
-                if aired_from:
-                    year = aired_from[:4]
-                    return year
-                else:
-                    print("No air date found for this anime.")
-            else:
-                print("Anime not found.")
-        else:
-            print("Error contacting Jikan API.")
-        return None
+        return self.jikan.get_year(title)
 
     def configure_driver(self) -> None:
+        self.driver: webdriver.Chrome = self.create_driver()
+
+    def create_driver(self) -> webdriver.Chrome:
+        launch_start = time.perf_counter()
         mobile_emulation: dict[str, str] = {"deviceName": "iPhone X"}
 
         options: webdriver.ChromeOptions = webdriver.ChromeOptions()
@@ -519,18 +835,25 @@ class HianimeExtractor:
         options.add_argument("--silent")
         options.add_experimental_option("excludeSwitches", ["enable-logging"])
 
-        seleniumwire_options: dict[str, bool] = {
+        seleniumwire_options: dict[str, Any] = {
             "verify_ssl": False,
             "disable_encoding": True,
+            # in-memory storage is the only one the size bound applies to: a backstop for the
+            # per-episode purge, the oldest requests are dropped beyond it
+            "request_storage": "memory",
+            "request_storage_max_size": 200,
         }
 
-        self.driver: webdriver.Chrome = webdriver.Chrome(
+        driver: webdriver.Chrome = webdriver.Chrome(
             options=options,
             seleniumwire_options=seleniumwire_options,
         )
+        # only playlists and subtitles are intercepted and stored, images, scripts, ads and
+        # video segments pass through the proxy untouched
+        driver.scopes = self.CAPTURE_SCOPES
 
         stealth(
-            self.driver,
+            driver,
             languages=["en-US", "en"],
             vendor="Google Inc.",
             platform="Win32",
@@ -539,9 +862,9 @@ class HianimeExtractor:
             fix_hairline=True,
         )
 
-        self.driver.implicitly_wait(10)
+        driver.implicitly_wait(10)
 
-        self.driver.execute_script(
+        driver.execute_script(
             """
                 window.alert = function() {};
                 window.confirm = function() { return true; };
@@ -552,9 +875,29 @@ class HianimeExtractor:
                 };
             """
         )
+        launch_time = time.perf_counter() - launch_start
+        get_metrics().record("driver_launch", launch_time)
+        print(f"{Fore.LIGHTBLACK_EX}Browser launched in {launch_time:.2f}s")
+        return driver
+
+    def create_worker_driver(self, anime: Anime) -> webdriver.Chrome:
+        """Launch an extra capture driver with the chosen server already selected."""
+        driver = self.create_driver()
+        self.load_page(driver, anime.url)
+        self.click_server_button(anime, driver)
+        return driver
 
-    def get_server_options(self, download_type: str) -> list[WebElement]:
-        WebDriverWait(self.driver, 10).until(
+    @staticmethod
+    def load_page(driver: webdriver.Chrome, url: str) -> None:
+        page_start = time.perf_counter()
+        driver.get(url)
+        page_time = time.perf_counter() - page_start
+        get_metrics().record("page_load", page_time)
+        print(f"{Fore.LIGHTBLACK_EX}Page loaded in {page_time:.2f}s")
+
+    def get_server_options(self, download_type: str, driver: webdriver.Chrome | None = None) -> list[WebElement]:
+        driver = driver or self.driver
+        WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.ID, "servers-content"))
         )
 
@@ -562,7 +905,7 @@ class HianimeExtractor:
             _type.find_element(By.CLASS_NAME, "ps__-list").find_elements(
                 By.TAG_NAME, "a"
             )
-            for _type in self.driver.find_element(
+            for _type in driver.find_element(
                 By.ID, "servers-content"
             ).find_elements(By.XPATH, "./div[contains(@class, 'ps_-block')]")
         ]
@@ -595,6 +938,10 @@ class HianimeExtractor:
                 if selection:
                     break
 
+        if not selection and self.unattended and options:
+            selection = options[0].text
+            print(f"{Fore.LIGHTYELLOW_EX}No preferred server is available, using {selection}")
+
         if not selection:
             if self.args.server:
                 print(
@@ -609,9 +956,7 @@ class HianimeExtractor:
                 server_names.append(option.text)
                 print(f"{Fore.LIGHTRED_EX} {i + 1}: {Fore.LIGHTCYAN_EX}{option.text}")
 
-            self.driver.requests.clear()
-            self.driver.quit()
-
+            # the browser session stays open while the prompt is answered
             selection = server_names[
                 get_int_in_range(
                     f"\n{Fore.LIGHTCYAN_EX}Server (default=1):{Fore.LIGHTYELLOW_EX} ",
@@ -621,15 +966,13 @@ class HianimeExtractor:
                 )
                 - 1
             ]
-        else:
-            self.driver.requests.clear()
-            self.driver.quit()
 
-        print(f"\n{Fore.LIGHTGREEN_EX}You chose: {Fore.LIGHTCYAN_EX}{selection}")
+        purge_requests(self.driver)
 
-        self.configure_driver()
-        self.driver.get(anime.url)
+        print(f"\n{Fore.LIGHTGREEN_EX}You chose: {Fore.LIGHTCYAN_EX}{selection}")
+        self.server_selection = selection
 
+        # look the buttons up again on the same page in case the elements went stale during the prompt
         options = self.get_server_options(anime.download_type)
 
         for option in options:
@@ -639,10 +982,10 @@ class HianimeExtractor:
         print(f"{Fore.LIGHTRED_EX}No matching server button could be found")
         return None
     
-    def click_server_button(self, anime: Anime) -> None:
+    def click_server_button(self, anime: Anime, driver: webdriver.Chrome | None = None) -> None:
         print(f"{Fore.LIGHTRED_EX}\nClicking server button...")
-        options = self.get_server_options(anime.download_type)
-        selection = self.args.server
+        options = self.get_server_options(anime.download_type, driver)
+        selection = self.server_selection
 
         for option in options:
             if option.text == selection:
@@ -653,150 +996,257 @@ class HianimeExtractor:
                     print(
                         f"{Fore.LIGHTRED_EX}Error clicking server button:\n\n{Fore.LIGHTWHITE_EX}{e}"
                     )
-                    input("Please manually click the button and then press Enter to continue...")
+                    if self.unattended:
+                        return
+                    with self._prompt_lock:
+                        input("Please manually click the button and then press Enter to continue...")
   
 
     def get_episode_urls(
         self, page: str, start_episode: int, end_episode: int
     ) -> list[dict[str, Any]]:
-        episodes: list[dict[str, Any]] = []
-        soup = BeautifulSoup(page, "html.parser")
-
-        links: list[Tag] = soup.find_all("a", attrs={"data-number": True})  # type: ignore
-
-        for link in links:
-            episode_number: int = int(str(link.get("data-number")))
-            if start_episode <= episode_number <= end_episode:
-                url = urljoin(self.URL, str(link["href"]))
-                episode_title = link.get("title")
-                episode_info = {
-                    "url": url,
-                    "number": int(episode_number),
-                    "title": episode_title,
-                }
-                episodes.append(episode_info)
-        return episodes
+        return parse_episode_links(page, self.URL, start_episode, end_episode)
+
+    def sample_browser_memory(self, driver: webdriver.Chrome) -> None:
+        """Record the memory of the chromedriver process tree, which holds every Chrome process."""
+        process = getattr(getattr(driver, "service", None), "process", None)
+        rss = process_tree_rss(process.pid) if process else None
+        if rss:
+            self.metrics.peak("browser_rss_bytes", rss)
+
+    def capture_episode(
+        self, driver: webdriver.Chrome, anime: Anime, episode: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Load an episode page in the given driver and add the captured media urls to the episode."""
+        print(
+            Fore.LIGHTGREEN_EX
+            + "Getting"
+            + Fore.LIGHTWHITE_EX
+            + f" Episode {episode['number']} - {episode['title']} from {episode['url']}"
+            + Fore.LIGHTWHITE_EX
+        )
 
-    def capture_media_requests(self, anime: Anime) -> dict[str, str] | None:
+        purge_requests(driver)
+        # start scanning before the page loads so early player requests are not missed
+        scanner = RequestScanner(driver)
+        try:
+            self.load_page(driver, episode["url"])
+            driver.execute_script("window.focus();")
+            media_requests = self.capture_media_requests(anime, driver, scanner)
+        finally:
+            scanner.close()
+            self.sample_browser_memory(driver)
+            purge_requests(driver)
+        if not media_requests:
+            print("No m3u8 file was found skipping download")
+            return None
+
+        media_requests["server"] = self.server_selection
+        episode.update(media_requests)
+        with self._capture_lock:
+            self.captured_video_urls.add(media_requests["m3u8"])
+            if self.args.subtitles and "vtt" in media_requests:
+                self.captured_subtitle_urls.add(media_requests["vtt"])
+        return media_requests
+
+    def capture_media_requests(
+        self,
+        anime: Anime,
+        driver: webdriver.Chrome | None = None,
+        scanner: RequestScanner | None = None,
+    ) -> dict[str, str] | None:
+        driver = driver or self.driver
+        owns_scanner = scanner is None
+        scanner = scanner or RequestScanner(driver)
         found_m3u8: bool = False
         found_vtt: bool = not self.args.subtitles
         attempt: int = 0
         urls: dict[str, Any] = {"all-vtt": []}
-        previously_found_vtt: int = 0
-
-        all_urls = []
-        while (
-            not found_m3u8 or not found_vtt
-        ) and self.args.max_retries >= attempt:
-            sys.stdout.write(
-                f"\r{Fore.CYAN}Attempt #{attempt} - {self.args.max_retries - attempt} Attempts Remaining"
-            )
-            sys.stdout.flush()
+        vtt_candidates: dict[str, Future] = {}
+        # subtitle tracks load together, so stop looking one quiet attempt after the last new one
+        last_vtt_attempt: int | None = None
 
-            for request in self.driver.requests:
-                if not request.response:
-                    continue
+        capture_started = attempt_started = time.monotonic()
+        try:
+            while (
+                not found_m3u8 or not found_vtt
+            ) and self.args.max_retries >= attempt:
+                sys.stdout.write(
+                    f"\r{Fore.CYAN}Attempt #{attempt} - {self.args.max_retries - attempt} Attempts Remaining"
+                )
+                sys.stdout.flush()
+
+                # wake up as soon as new requests complete instead of sleeping a full attempt
+                new_requests = scanner.wait(max(0.0, attempt_started + 1 - time.monotonic()))
+                for uri, headers in new_requests:
+                    if (
+                        not found_m3u8
+                        and uri.endswith(".m3u8")
+                        and "master" in uri
+                        and uri not in self.captured_video_urls
+                    ):
+                        urls["m3u8"] = uri
+                        urls["headers"] = headers
+                        found_m3u8 = True
+                        continue
+                    if (
+                        not found_vtt
+                        and ".vtt" in uri
+                        and "thumbnail" not in uri
+                        and uri not in self.captured_subtitle_urls
+                        and uri not in vtt_candidates
+                        and not any(lang in uri for lang in self.OTHER_LANGS)
+                    ):
+                        # language detection runs in the background and wakes the scanner when done
+                        vtt_candidates[uri] = self.subtitle_classifier.submit(
+                            uri, headers, lambda _: scanner.notify()
+                        )
+
+                for uri, future in list(vtt_candidates.items()):
+                    if not future.done():
+                        continue
+                    del vtt_candidates[uri]
+                    if future.result() == self.SUBTITLE_LANG:
+                        urls["all-vtt"].append(uri)
+                        last_vtt_attempt = attempt
 
-                uri = request.url.lower()
-                if uri not in all_urls:
-                    all_urls.append(uri)
-                if (
-                    not found_m3u8
-                    and uri.endswith(".m3u8")
-                    and "master" in uri
-                    and uri not in self.captured_video_urls
-                ):
-                    urls["m3u8"] = uri
-                    urls["headers"] = dict(request.headers)
-                    found_m3u8 = True
-                    continue
                 if (
                     not found_vtt
-                    and ".vtt" in uri
-                    and "thumbnail" not in uri
-                    and uri not in self.captured_subtitle_urls
-                    and not any(lang in uri for lang in self.OTHER_LANGS)
-                    and detect_lang(
-                        requests.get(uri, headers=dict(request.headers)).content.decode(
-                            self.ENCODING
-                        )
-                    )
-                    == self.SUBTITLE_LANG
+                    and not vtt_candidates
+                    and last_vtt_attempt is not None
+                    and attempt > last_vtt_attempt
                 ):
-                    if uri in urls["all-vtt"]:
-                        previously_found_vtt += 1
-                        if previously_found_vtt >= len(urls["all-vtt"]):
-                            found_vtt = True
-                        continue
+                    found_vtt = True
 
-                    urls["all-vtt"].append(uri)
-            attempt += 1
-            if attempt in self.SERVER_REFRESH:
-                self.click_server_button(anime)
-            if attempt in self.DOWNLOAD_REFRESH:
-                print(f"\n{Fore.LIGHTRED_EX}Attempting page refresh..")
-                self.driver.refresh()
-            time.sleep(1)
+                if time.monotonic() - attempt_started < 1:
+                    continue
+                attempt_started = time.monotonic()
+                attempt += 1
+                if attempt in self.SERVER_REFRESH:
+                    self.metrics.count("capture_server_clicks")
+                    self.click_server_button(anime, driver)
+                if attempt in self.DOWNLOAD_REFRESH:
+                    self.metrics.count("capture_refreshes")
+                    print(f"\n{Fore.LIGHTRED_EX}Attempting page refresh..")
+                    driver.refresh()
+        finally:
+            if owns_scanner:
+                scanner.close()
+            self.metrics.record("capture", time.monotonic() - capture_started)
+            self.metrics.count("capture_attempts", attempt + 1)
+            self.metrics.count("captures_found" if found_m3u8 else "captures_failed")
 
         print()
         if not found_m3u8:
             print(f"{Fore.LIGHTRED_EX}No .m3u8 streams found.")
             return None
         if not found_vtt:
-            print(
-                f"\n{Fore.LIGHTRED_EX}No .vtt streams found. Check that the subtitles are not apart of the video file, option '--subtitles' can be used to enable downloading subtitles."
-            )
-            self.args.subtitles = not get_confirmation(
-                f"\n{Fore.LIGHTCYAN_EX}Would you like to skip the collection of subtitles on the following episodes (y/n): "
-            )
-            print()
+            if self.unattended:
+                if self.args.subtitles:
+                    print(f"{Fore.LIGHTYELLOW_EX}No .vtt streams found, downloading without subtitles")
+                return urls
+            # prompts are serialized so parallel capture drivers don't ask at the same time
+            with self._prompt_lock:
+                if not self.args.subtitles:
+                    return urls
+                print(
+                    f"\n{Fore.LIGHTRED_EX}No .vtt streams found. Check that the subtitles are not apart of the video file, option '--subtitles' can be used to enable downloading subtitles."
+                )
+                self.args.subtitles = not get_confirmation(
+                    f"\n{Fore.LIGHTCYAN_EX}Would you like to skip the collection of subtitles on the following episodes (y/n): "
+                )
+                print()
         elif self.args.subtitles:
-            if len(urls["all-vtt"]) == 1:
+            if len(urls["all-vtt"]) == 1 or self.unattended:
                 urls["vtt"] = urls["all-vtt"][0]
                 return urls
 
-            print(
-                "\nMore than one subtitle file was found plesae select the on you would like to download:\n"
-            )
-            for i, vtt in enumerate(urls["all-vtt"]):
-                print(f" {i + 1} - {vtt}")
+            with self._prompt_lock:
+                print(
+                    "\nMore than one subtitle file was found plesae select the on you would like to download:\n"
+                )
+                for i, vtt in enumerate(urls["all-vtt"]):
+                    print(f" {i + 1} - {vtt}")
 
-            selection = get_int_in_range(
-                "\nSelected Subtitle: ", 1, len(urls["all-vtt"]) + 1
-            )
-            print()
+                selection = get_int_in_range(
+                    "\nSelected Subtitle: ", 1, len(urls["all-vtt"]) + 1
+                )
+                print()
 
             urls["vtt"] = urls["all-vtt"][selection - 1]
 
         return urls
 
-    @staticmethod
-    def look_for_variants(m3u8_url: str, m3u8_headers: dict[str, Any]) -> str:
-        response = requests.get(m3u8_url, headers=m3u8_headers)
-        lines = response.text.splitlines()
-        url = None
-        for line in lines:
-            if line.strip().endswith(".m3u8") and "iframe" not in line:
-                url = urljoin(m3u8_url, line.strip())
-                break
-        if not url:
+    def get_master_playlist(self, m3u8_url: str, m3u8_headers: dict[str, Any]) -> MasterPlaylist:
+        """Fetch and parse a master playlist once per run, retries reuse the parsed result."""
+        with self._playlist_lock:
+            master = self._master_playlists.get(m3u8_url)
+        if master is None:
+            response = self.session.get(m3u8_url, headers=m3u8_headers)
+            response.raise_for_status()
+            master = parse_master(response.text, m3u8_url)
+            with self._playlist_lock:
+                self._master_playlists[m3u8_url] = master
+        return master
+
+    def look_for_variants(self, m3u8_url: str, m3u8_headers: dict[str, Any]) -> str:
+        with self.metrics.time("variant_lookup"):
+            master = self.get_master_playlist(m3u8_url, m3u8_headers)
+        if master.is_media:
+            return m3u8_url
+
+        max_bitrate = getattr(self.args, "max_bitrate", None)
+        variant = select_variant(
+            master.variants,
+            getattr(self.args, "max_resolution", None),
+            max_bitrate * 1000 if max_bitrate else None,
+        )
+        if not variant:
             print("No valid video variant found in master.m3u8")
             return ""
 
-        return url
+        return variant.url
 
-    def yt_dlp_download(self, url: str, headers: dict[str, str], location: str, episode_name: str = "") -> bool:
+    def progress_hook(self, episode_name: str) -> Callable[[dict[str, Any]], None]:
+        """Progress hook in the yt-dlp format, shared by the yt-dlp and native downloaders."""
         def progress_hook(d):
-            if d['status'] == 'downloading':
-                with self._progress_lock:
-                    self.download_progress[episode_name] = {
-                        "eta": d.get("eta", None)
-                    }
-            elif d['status'] == 'finished':
-                with self._progress_lock:
-                    self.download_progress[episode_name] = {
-                        "done": True
-                    }
+            # worker threads never see Ctrl-C, so stop the download from inside the downloader
+            if self.downloads.is_cancelled(self.download_group):
+                raise KeyboardInterrupt
+            self.progress.update(episode_name, d)
+
+        return progress_hook
+
+    def yt_dlp_download(
+        self, url: str, headers: dict[str, str], location: str, episode_name: str = "", playlist: str | None = None
+    ) -> bool:
+        """
+        Download the variant playlist `url` with yt-dlp, paced by the shared rate controller.
+
+        `playlist` can hold the already fetched playlist text, its segment urls let every
+        fragment request wait for a token of the host it is sent to.
+        """
+        progress_hook = self.progress_hook(episode_name)
+        last_fragment: dict[str, int] = {}
+        segments = [segment.url for segment in parse_media(playlist, url).segments] if playlist else []
+
+        def fragment_url(index: int) -> str:
+            """Url of the fragment at `index`, the variant playlist when the segments are unknown."""
+            return segments[index] if 0 <= index < len(segments) else url
+
+        logger = RateControlLogger(self.rate_controller, fragment_url(0))
+
+        def rate_hook(d):
+            # yt-dlp fetches fragments one after another and calls the hook after each one,
+            # blocking here paces the next fragment request with the shared rate controller.
+            # fragment_index counts the finished fragments, so it is also the next one's index
+            fragment = d.get("fragment_index")
+            if d["status"] == "downloading" and fragment and fragment != last_fragment.get("index"):
+                last_fragment["index"] = fragment
+                self.rate_controller.success(fragment_url(fragment - 1))
+                if not segments or fragment < len(segments):
+                    logger.url = fragment_url(fragment)
+                    self.rate_controller.acquire(logger.url)
 
         yt_dlp_options: dict[str, Any] = {
             "no_warnings": False,
@@ -804,92 +1254,47 @@ class HianimeExtractor:
             "outtmpl": location,
             "format": "best",
             "http_headers": headers,
-            "logger": SilentLogger(),
+            "logger": logger,
             "fragment_retries": 10,
             "retries": 10,
             "socket_timeout": 60,
-            "sleep_interval_requests": 1,
             "force_keyframes_at_cuts": True,
             "allow_unplayable_formats": True,
-            "progress_hooks": [progress_hook],
+            "continuedl": True,
+            "progress_hooks": [progress_hook, rate_hook],
         }
 
+        self.rate_controller.acquire(url)
+        if segments:
+            self.rate_controller.acquire(segments[0])
+
         _return = True
         with YoutubeDL(yt_dlp_options) as ydl:
             try:
                 ydl.download([url])
             except KeyboardInterrupt:
+                # part files are kept so the next run resumes instead of starting over
                 print(
-                    f"\n\n{Fore.LIGHTCYAN_EX}Canceling Downloads...\nRemoving Temp Files for {location[location.rfind(os.sep) + 1:-4]}"
+                    f"\n\n{Fore.LIGHTCYAN_EX}Canceling Downloads...\nKeeping partial files for {location[location.rfind(os.sep) + 1:-4]}, rerun to resume"
                 )
                 _return = False
                 ydl.close()
 
-        if not _return:
-            for file in [
-                f
-                for f in glob(location[:-4] + ".*")
-                if not f.endswith((".mp4", ".vtt"))
-            ]:
-                safe_remove(file)
-
         return _return
 
     def get_anime(self, name: str | None = None) -> Anime | None:
-        os.system("cls" if os.name == "nt" else "clear")
+        if not self.unattended:
+            os.system("cls" if os.name == "nt" else "clear")
         print(Fore.LIGHTGREEN_EX + "\nHiAnime " + Fore.LIGHTWHITE_EX + "GDown\n")
 
         search_name: str = name if name else input("Enter Name of Anime: ")
 
-        # GET ANIME ELEMENTS FROM PAGE
-        url: str = urljoin(self.URL, "/search?keyword=" + search_name)
-        search_page_response: requests.Response = requests.get(
-            url, headers=self.HEADERS
-        )
-        search_page_soup: BeautifulSoup = BeautifulSoup(
-            search_page_response.content, "html.parser"
-        )
-
-        main_content: Tag = search_page_soup.find("div", id="main-content")  # type: ignore
-        anime_elements: list[Tag] = main_content.find_all("div", class_="flw-item")  # type: ignore
+        anime_list: list[Anime] = self.search_anime(search_name, getattr(self.args, "search_pages", 1))
 
-        if not anime_elements:
+        if not anime_list:
             print("No anime found")
             return  # Exit if no anime is found
 
-        # MAKE DICT WITH ANIME TITLES
-        anime_list: list[Anime] = []
-        for i, element in enumerate(anime_elements, 1):
-            raw_name: str = element.find("h3", class_="film-name").text  # type: ignore
-            name_of_anime: str = raw_name.translate(self.TITLE_TRANS)
-            url_of_anime: str = urljoin(
-                self.URL,
-                str(element.find("a", class_="film-poster-ahref item-qtip")["href"]),  # type: ignore
-            )
-
-            try:
-                # Some anime has no subs
-                sub_episodes_available: int = element.find(
-                    "div", class_="tick-item tick-sub"
-                ).text  # type: ignore
-            except AttributeError:
-                sub_episodes_available: int = 0
-            try:
-                dub_episodes_available: int = element.find(
-                    "div", class_="tick-item tick-dub"
-                ).text  # type: ignore
-            except AttributeError:
-                dub_episodes_available: int = 0
-
-            anime_list.append(
-                Anime(
-                    name_of_anime,
-                    url_of_anime,
-                    int(sub_episodes_available),
-                    int(dub_episodes_available),
-                )
-            )
-
         # PRINT ANIME TITLES TO THE CONSOLE
         for i, anime in enumerate(anime_list, start=1):
             print(
@@ -914,6 +1319,11 @@ class HianimeExtractor:
                 + " dub"
             )
 
+        if self.unattended:
+            # prefer an exact title match, search results are ordered by relevance otherwise
+            wanted = search_name.translate(self.TITLE_TRANS).lower().strip()
+            return next((anime for anime in anime_list if anime.name.lower().strip() == wanted), anime_list[0])
+
         # USER SELECTS ANIME
         return anime_list[
             get_int_in_range(
@@ -924,9 +1334,97 @@ class HianimeExtractor:
             - 1
         ]
 
+    def search_anime(self, query: str, pages: int = 1) -> list[Anime]:
+        """
+        Results of the first `pages` search pages, in site order.
+
+        Pages still fresh in the catalog cache are not requested again, the missing ones are
+        fetched concurrently.
+        """
+        results: dict[int, list[dict[str, Any]]] = {}
+        for page in range(1, max(1, pages) + 1):
+            cached = self.catalog_cache.get(query, page) if self.catalog_cache else None
+            if cached is not None:
+                results[page] = cached
+
+        missing = [page for page in range(1, max(1, pages) + 1) if page not in results]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(len(missing), 4)) as executor:
+                fetched = executor.map(lambda page: self.fetch_search_page(query, page), missing)
+                for page, records in zip(missing, fetched):
+                    results[page] = records
+                    if self.catalog_cache:
+                        self.catalog_cache.put(query, page, records)
+
+        anime_list: list[Anime] = []
+        seen: set[str] = set()
+        for page in sorted(results):
+            for record in results[page]:
+                # pages past the last one may repeat earlier results
+                if record["url"] not in seen:
+                    seen.add(record["url"])
+                    anime_list.append(Anime(**record))
+        return anime_list
+
+    def fetch_search_page(self, query: str, page: int = 1) -> list[dict[str, Any]]:
+        params: dict[str, Any] = {"keyword": query}
+        if page > 1:
+            params["page"] = page
+        response = self.session.get(urljoin(self.URL, "/search"), params=params, headers=self.HEADERS)
+        response.raise_for_status()
+        # only the result list is turned into a tree, the rest of the page is skipped. Sidebar
+        # and trending cards use the same flw-item class outside of #main-content
+        soup = BeautifulSoup(response.content, "html.parser", parse_only=SoupStrainer("div", id="main-content"))
+        main_content = soup.find("div", id="main-content")
+        if not main_content:
+            return []
+
+        records: list[dict[str, Any]] = []
+        for element in main_content.find_all("div", class_="flw-item"):  # type: ignore
+            name_tag = element.find("h3", class_="film-name")
+            link = element.find("a", class_="film-poster-ahref")
+            if not name_tag or not link:
+                continue
+            # Some anime has no subs or no dubs
+            sub = element.find("div", class_="tick-item tick-sub")
+            dub = element.find("div", class_="tick-item tick-dub")
+            records.append(
+                {
+                    "name": name_tag.text.translate(self.TITLE_TRANS),
+                    "url": urljoin(self.URL, str(link["href"])),
+                    "sub_episodes": int(sub.text) if sub and sub.text.strip().isdigit() else 0,
+                    "dub_episodes": int(dub.text) if dub and dub.text.strip().isdigit() else 0,
+                }
+            )
+        return records
+
     def get_anime_from_link(self, link: str) -> Anime:
-        link_page: requests.Response = requests.get(link, headers=self.HEADERS)
-        link_page_soup = BeautifulSoup(link_page.content, "html.parser")
+        # revalidate a page seen before, an unchanged page answers 304 without a body
+        cached = self.catalog_cache.get_page(link) if self.catalog_cache else None
+        headers = dict(self.HEADERS)
+        if cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        link_page: requests.Response = self.session.get(link, headers=headers)
+        if cached and link_page.status_code == 304:
+            # a confirmed page starts a new max age
+            self.catalog_cache.put_page(link, cached["etag"], cached["last_modified"], cached["record"])
+            return Anime(**cached["record"])
+
+        anime = self.parse_anime_page(link_page.content)
+        if self.catalog_cache and (link_page.headers.get("ETag") or link_page.headers.get("Last-Modified")):
+            self.catalog_cache.put_page(
+                link,
+                link_page.headers.get("ETag"),
+                link_page.headers.get("Last-Modified"),
+                {"name": anime.name, "url": anime.url, "sub_episodes": anime.sub_episodes, "dub_episodes": anime.dub_episodes},
+            )
+        return anime
+
+    def parse_anime_page(self, content: bytes) -> Anime:
+        link_page_soup = BeautifulSoup(content, "html.parser")
         main_div: Tag = link_page_soup.find("div", "anisc-detail")  # type: ignore
         anime_stats: Tag = main_div.find("div", "film-stats")  # type: ignore
 
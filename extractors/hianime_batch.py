@@ -0,0 +1,197 @@
+import copy
+import json
+from argparse import Namespace
+from dataclasses import dataclass, fields
+from typing import Any
+
+from colorama import Fore
+
+from extractors.hianime import Anime, HianimeExtractor
+
+
+@dataclass
+class BatchJob:
+    """One series to download in a batch run, options left as None use the command line ones."""
+
+    link: str | None = None
+    name: str | None = None
+    season: int = 1
+    start: int = 1
+    end: int | None = None
+    # "sub" or "dub", None picks default_download_type or whatever is available
+    download_type: str | None = None
+    server: str | None = None
+    output_dir: str | None = None
+    subtitles: bool | None = None
+    # release year for movies (--is-movie), looked up on Jikan when missing
+    year: str | None = None
+
+    @property
+    def label(self) -> str:
+        return self.name or self.link or "?"
+
+
+def load_manifest(path: str) -> list[BatchJob]:
+    """
+    Read a batch manifest, a JSON list of jobs or an object with a "jobs" list.
+
+    Each job needs a "link" or a "name", "type" is accepted as a short form of "download_type".
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    entries = data["jobs"] if isinstance(data, dict) else data
+
+    known = {field.name for field in fields(BatchJob)}
+    jobs: list[BatchJob] = []
+    for i, entry in enumerate(entries, 1):
+        entry = dict(entry)
+        if "type" in entry:
+            entry["download_type"] = entry.pop("type")
+        unknown = set(entry) - known
+        if unknown:
+            raise ValueError(f"Job {i} in {path} has unknown keys: {', '.join(sorted(unknown))}")
+        job = BatchJob(**entry)
+        if not job.link and not job.name:
+            raise ValueError(f"Job {i} in {path} needs a 'link' or a 'name'")
+        if job.download_type and job.download_type.lower() not in ("sub", "dub"):
+            raise ValueError(f"Job {i} in {path} has an invalid type '{job.download_type}', expected sub or dub")
+        jobs.append(job)
+    return jobs
+
+
+class HianimeBatch:
+    """
+    Downloads every series of a manifest in one process without prompting.
+
+    Every job runs on a shallow copy of one extractor with its own options, so all jobs share
+    the browser pool, download scheduler, session and caches, while the downloads of earlier
+    jobs keep the options they were queued with. Jobs are resolved one after another while
+    the downloads of earlier jobs keep running, a job that fails or is cancelled is reported
+    and only its own downloads are dropped.
+    """
+
+    def __init__(self, args: Namespace, manifest: str) -> None:
+        self.args = args
+        self.jobs = load_manifest(manifest)
+        self.extractor = HianimeExtractor(args=Namespace(**vars(args)))
+        self.extractor.unattended = True
+        self.extractor.keep_browser = True
+        self.results: dict[int, str] = {}
+
+    def job_args(self, job: BatchJob) -> Namespace:
+        args = Namespace(**vars(self.args))
+        args.download_all = True
+        if job.server:
+            args.server = job.server
+        if job.output_dir:
+            args.output_dir = job.output_dir
+        if job.subtitles is not None:
+            args.subtitles = job.subtitles
+        return args
+
+    def choose_download_type(self, job: BatchJob, anime: Anime) -> str:
+        wanted = (job.download_type or self.args.default_download_type or "").lower()
+        if wanted in ("sub", "dub"):
+            if getattr(anime, f"{wanted}_episodes") == 0:
+                raise ValueError(f"No {wanted} episodes available")
+            return wanted
+        return "sub" if anime.sub_episodes != 0 else "dub"
+
+    def job_extractor(self, job: BatchJob, group: int) -> HianimeExtractor:
+        """A copy of the shared extractor with the options of `job`, its downloads queued under `group`."""
+        extractor = copy.copy(self.extractor)
+        extractor.args = self.job_args(job)
+        # the server chosen for the previous series must not carry over
+        extractor.server_selection = extractor.args.server
+        extractor.download_group = group
+        return extractor
+
+    def run_job(self, i: int, job: BatchJob) -> tuple[str, Anime, list[dict[str, Any]]] | None:
+        """Resolve job `i` and queue its downloads, returns None if its capture was cancelled."""
+        extractor = self.job_extractor(job, i)
+        try:
+            anime = extractor.get_anime_from_link(job.link) if job.link else extractor.get_anime(job.name)
+            if not anime:
+                raise ValueError("Anime not found")
+            anime.download_type = self.choose_download_type(job, anime)
+            if self.args.is_movie:
+                year = job.year or extractor.get_anime_year(job.name or anime.name)
+                if year:
+                    anime.year = year
+                    anime.name += f" ({year})"
+                else:
+                    print(f"{Fore.LIGHTYELLOW_EX}No release year found for {anime.name}")
+            else:
+                anime.season_number = job.season
+
+            available = getattr(anime, f"{anime.download_type}_episodes")
+            start_ep = max(1, job.start)
+            end_ep = min(job.end or available, available)
+            if start_ep > end_ep:
+                raise ValueError(f"Episode range {start_ep} - {end_ep} is empty, {available} episode(s) available")
+
+            print(
+                f"\n{Fore.LIGHTGREEN_EX}Batch: {Fore.LIGHTBLUE_EX}{anime.name}{Fore.LIGHTGREEN_EX}"
+                f" season {anime.season_number} ({anime.download_type}), episodes {start_ep} - {end_ep}\n"
+            )
+            folder = extractor.create_anime_folder(anime)
+            episode_list = extractor.download_series(anime, folder, start_ep, end_ep)
+            if episode_list is None:
+                return None
+            return folder, anime, episode_list
+        finally:
+            # the browsers this job opened or closed are the ones the next job reuses
+            self.extractor.driver_pool = extractor.driver_pool
+
+    def close(self) -> None:
+        self.extractor.close()
+
+    def run(self) -> None:
+        extractor = self.extractor
+        # several jobs may cover parts of the same season, their episodes go into one json file
+        series: dict[tuple[str, int], tuple[Anime, dict[int, dict[str, Any]]]] = {}
+
+        if self.args.is_movie:
+            # resolve all release years up front, concurrently but within Jikan's rate limit
+            titles = [job.name for job in self.jobs if job.name and not job.year]
+            if titles:
+                print(f"{Fore.LIGHTGREEN_EX}Looking up release years for {len(titles)} title(s)...")
+                extractor.jikan.prefetch(titles)
+
+        try:
+            for i, job in enumerate(self.jobs, 1):
+                print(f"\n{Fore.LIGHTCYAN_EX}Job {i}/{len(self.jobs)}: {job.label}")
+                try:
+                    result = self.run_job(i, job)
+                except Exception as e:
+                    self.results[i] = f"failed: {e}"
+                    print(f"\n{Fore.LIGHTRED_EX}Job {i} ({job.label}) failed: {e}")
+                    continue
+                if result is None:
+                    # download_series already dropped the downloads of this job only
+                    self.results[i] = "cancelled"
+                    continue
+                folder, anime, episode_list = result
+                _, episodes = series.setdefault((folder, anime.season_number), (anime, {}))
+                episodes.update({episode["number"]: episode for episode in episode_list})
+                self.results[i] = f"queued {len(episode_list)} episode(s)"
+
+            if not extractor.downloads.cancelled.is_set():
+                extractor.wait_for_downloads()
+        except KeyboardInterrupt:
+            print(f"\n\n{Fore.LIGHTCYAN_EX}Canceling Downloads...")
+            extractor.downloads.cancel()
+            extractor.downloads.wait()
+        finally:
+            if extractor.driver_pool:
+                extractor.driver_pool.close()
+                extractor.driver_pool = None
+
+        for (folder, _), (anime, episodes) in series.items():
+            previous = extractor.read_anime_json(folder, anime)
+            merged = {**previous, **episodes}
+            extractor.write_anime_json(folder, anime, [merged[number] for number in sorted(merged)])
+
+        print(f"\n{Fore.LIGHTGREEN_EX}Batch summary:")
+        for i, job in enumerate(self.jobs, 1):
+            print(f" {i}: {job.label} - {self.results.get(i, 'not started')}")
@@ -0,0 +1,168 @@
+import re
+from typing import Any
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from tools.episode_index import parse_episode_links
+from tools.session import get_session
+
+
+class HianimeHttpResolver:
+    """
+    Resolves episode streams by following the site's AJAX endpoints with plain HTTP.
+
+    The flow mirrors what the player does in the browser:
+    episode list -> server list -> source (embed link) -> embed sources (m3u8 + tracks).
+    Every method returns None when the site answers with something unexpected, so the
+    caller can fall back to browser capture.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: dict[str, str],
+        session: requests.Session | None = None,
+        timeout: int = 20,
+    ) -> None:
+        self.URL = base_url
+        self.HEADERS = headers
+        self.timeout = timeout
+        self.session = session or get_session()
+
+    def _get_json(self, url: str, headers: dict[str, str] | None = None) -> dict[str, Any] | None:
+        try:
+            response = self.session.get(url, headers={**self.HEADERS, **(headers or {})}, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError):
+            return None
+
+    def _ajax(self, path: str, referer: str) -> dict[str, Any] | None:
+        return self._get_json(
+            urljoin(self.URL, path),
+            headers={"X-Requested-With": "XMLHttpRequest", "Referer": referer},
+        )
+
+    @staticmethod
+    def get_anime_id(anime_url: str) -> str | None:
+        """Series pages end with the numeric id, e.g. /watch/some-anime-1234."""
+        match = re.search(r"-(\d+)/?$", urlparse(anime_url).path)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def get_episode_id(episode_url: str) -> str | None:
+        """Episode links carry their id in the query string, e.g. /watch/some-anime-1234?ep=5678."""
+        ep = parse_qs(urlparse(episode_url).query).get("ep")
+        return ep[0] if ep else None
+
+    def get_episode_urls(
+        self, anime_url: str, start_episode: int, end_episode: int
+    ) -> list[dict[str, Any]] | None:
+        anime_id = self.get_anime_id(anime_url)
+        if not anime_id:
+            return None
+        data = self._ajax(f"/ajax/v2/episode/list/{anime_id}", anime_url)
+        if not data or "html" not in data:
+            return None
+
+        return parse_episode_links(data["html"], self.URL, start_episode, end_episode)
+
+    def get_servers(self, episode_url: str, download_type: str) -> list[dict[str, str]] | None:
+        """Returns [{"name": "HD-1", "id": "..."}] for the given sub/dub type."""
+        episode_id = self.get_episode_id(episode_url)
+        if not episode_id:
+            return None
+        data = self._ajax(f"/ajax/v2/episode/servers?episodeId={episode_id}", episode_url)
+        if not data or "html" not in data:
+            return None
+
+        soup = BeautifulSoup(data["html"], "html.parser")
+        servers: list[dict[str, str]] = []
+        for item in soup.find_all("div", class_="server-item"):
+            if item.get("data-type") != download_type:
+                continue
+            servers.append({"name": item.get_text(strip=True), "id": str(item.get("data-id"))})
+        return servers
+
+    def get_source_link(self, server_id: str, episode_url: str) -> str | None:
+        data = self._ajax(f"/ajax/v2/episode/sources?id={server_id}", episode_url)
+        if not data:
+            return None
+        return data.get("link") or None
+
+    def resolve_embed(self, embed_link: str) -> dict[str, Any] | None:
+        """Ask the embed player for its sources, the same call the player script makes."""
+        parsed = urlparse(embed_link)
+        path, _, embed_id = parsed.path.rpartition("/")
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        headers = {
+            "User-Agent": self.HEADERS["User-Agent"],
+            "Referer": f"{origin}/",
+            "Origin": origin,
+        }
+        data = self._get_json(
+            f"{origin}{path}/getSources?id={embed_id}",
+            headers={**headers, "X-Requested-With": "XMLHttpRequest", "Referer": embed_link},
+        )
+        # encrypted sources come back as a string instead of a list
+        if not data or data.get("encrypted") or not isinstance(data.get("sources"), list):
+            return None
+
+        m3u8 = next(
+            (source["file"] for source in data["sources"] if str(source.get("file", "")).endswith(".m3u8")),
+            None,
+        )
+        if not m3u8:
+            return None
+
+        tracks = [
+            track
+            for track in data.get("tracks", [])
+            if track.get("kind") in ("captions", "subtitles") and str(track.get("file", "")).endswith(".vtt")
+        ]
+        return {"m3u8": m3u8, "headers": headers, "tracks": tracks}
+
+    def resolve(
+        self,
+        episode: dict[str, Any],
+        download_type: str,
+        server_names: list[str],
+        subtitle_label: str = "english",
+    ) -> dict[str, Any] | None:
+        """
+        Resolve an episode to the same {"m3u8", "vtt", "headers"} dict that browser capture produces.
+
+        Servers are tried in the order of `server_names`, then the rest in site order.
+        """
+        servers = self.get_servers(episode["url"], download_type)
+        if not servers:
+            return None
+
+        wanted = [name.lower().strip() for name in server_names]
+        servers.sort(key=lambda s: wanted.index(s["name"].lower()) if s["name"].lower() in wanted else len(wanted))
+
+        for server in servers:
+            link = self.get_source_link(server["id"], episode["url"])
+            if not link:
+                continue
+            sources = self.resolve_embed(link)
+            if not sources:
+                continue
+
+            urls: dict[str, Any] = {
+                "m3u8": sources["m3u8"],
+                "headers": sources["headers"],
+                "server": server["name"],
+                "all-vtt": [
+                    track["file"]
+                    for track in sources["tracks"]
+                    if subtitle_label in str(track.get("label", "")).lower()
+                ],
+            }
+            if urls["all-vtt"]:
+                default = next((t["file"] for t in sources["tracks"] if t.get("default")), None)
+                urls["vtt"] = default if default in urls["all-vtt"] else urls["all-vtt"][0]
+            return urls
+        return None
@@ -0,0 +1,152 @@
+import json
+import os
+import re
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from glob import escape, glob
+from typing import Any
+
+from colorama import Fore
+
+from extractors.hianime import Anime, HianimeExtractor
+
+SEASON_JSON_RE = re.compile(r" \(Season (-?\d+)\)\.json$")
+
+
+class HianimeSync:
+    """
+    Downloads the episodes aired since the last run of every series under the output directory.
+
+    Reads the `<name> (Season N).json` files written by `write_anime_json`, checks the current
+    episode counts of all series in parallel and captures only the episodes from the first one
+    missing from the folder. Only finished downloads are added to the json files, and entries
+    whose file is incomplete count as missing, so failed or cancelled episodes are tried again
+    by the next sync. Runs without prompts and shares one browser pool and download
+    scheduler across series, like a batch run.
+    """
+
+    def __init__(self, args: Namespace, workers: int = 8) -> None:
+        self.args = args
+        self.workers = workers
+        self.extractor = HianimeExtractor(args=Namespace(**vars(args)))
+        self.extractor.args.download_all = True
+        self.extractor.unattended = True
+        self.extractor.keep_browser = True
+
+    def find_series(self) -> list[tuple[str, Anime, dict[int, dict[str, Any]]]]:
+        """(folder, anime, episodes by number) of every season json under the output directory."""
+        anime_fields = {field.name for field in fields(Anime)}
+        series = []
+        root = os.path.abspath(self.args.output_dir)
+        for path in sorted(glob(os.path.join(escape(root), "*", "*.json"))):
+            if not SEASON_JSON_RE.search(path):
+                continue
+            try:
+                with open(path, "r") as json_file:
+                    data = json.load(json_file)
+                anime = Anime(**{key: value for key, value in data.items() if key in anime_fields})
+                episodes = {episode["number"]: episode for episode in data["episodes"]}
+            except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+                print(f"{Fore.LIGHTRED_EX}Skipping {path}: {e}")
+                continue
+            # movies (-1) and OVAs (0) are not airing seasons
+            if anime.season_number < 1 or anime.download_type not in ("sub", "dub"):
+                continue
+            series.append((os.path.dirname(path) + os.sep, anime, episodes))
+        return series
+
+    def first_missing(self, folder: str, anime: Anime, episodes: dict[int, dict[str, Any]]) -> int:
+        """
+        The first episode number past the lowest recorded one that is not downloaded.
+
+        Single and batch runs also write episodes whose download failed to the json file, so
+        an entry only counts once its file is complete.
+        """
+        extractor = self.extractor
+        number = min(episodes, default=1)
+        while number in episodes and extractor.is_downloaded(
+            f"{folder}{extractor.episode_filename(anime, episodes[number])}.mp4", episodes[number]
+        ):
+            number += 1
+        return number
+
+    def finished(self, folder: str, anime: Anime, episode_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """The episodes whose download completed."""
+        extractor = self.extractor
+        return [
+            episode
+            for episode in episode_list
+            if extractor.is_downloaded(f"{folder}{extractor.episode_filename(anime, episode)}.mp4", episode)
+        ]
+
+    def check(self, anime: Anime) -> Anime | None:
+        try:
+            return self.extractor.get_anime_from_link(anime.url)
+        except Exception as e:
+            print(f"{Fore.LIGHTRED_EX}Could not check {anime.name}: {e}")
+            return None
+
+    def close(self) -> None:
+        self.extractor.close()
+
+    def run(self) -> None:
+        extractor = self.extractor
+        series = self.find_series()
+        if not series:
+            print(f"{Fore.LIGHTYELLOW_EX}No season json files found under {self.args.output_dir}")
+            return
+
+        print(f"{Fore.LIGHTGREEN_EX}Checking {len(series)} series for new episodes...\n")
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sync-check") as executor:
+            current = list(executor.map(lambda entry: self.check(entry[1]), series))
+
+        updates: list[tuple[str, Anime, dict[int, dict[str, Any]], list[dict[str, Any]]]] = []
+        try:
+            for (folder, anime, episodes), fresh in zip(series, current):
+                if not fresh:
+                    continue
+                available = getattr(fresh, f"{anime.download_type}_episodes")
+                start_ep = self.first_missing(folder, anime, episodes)
+                anime.sub_episodes, anime.dub_episodes = fresh.sub_episodes, fresh.dub_episodes
+                if start_ep > available:
+                    print(f"{Fore.LIGHTWHITE_EX}{anime.name} season {anime.season_number} is up to date")
+                    continue
+
+                print(
+                    f"\n{Fore.LIGHTGREEN_EX}New episodes for {Fore.LIGHTBLUE_EX}{anime.name}{Fore.LIGHTGREEN_EX}"
+                    f" season {anime.season_number}: {start_ep} - {available}\n"
+                )
+                try:
+                    episode_list = extractor.download_series(anime, folder, start_ep, available)
+                except Exception as e:
+                    print(f"\n{Fore.LIGHTRED_EX}Syncing {anime.name} failed: {e}")
+                    continue
+                if episode_list is None:
+                    break
+                updates.append((folder, anime, episodes, episode_list))
+
+            if not extractor.downloads.cancelled.is_set():
+                extractor.wait_for_downloads()
+        except KeyboardInterrupt:
+            print(f"\n\n{Fore.LIGHTCYAN_EX}Canceling Downloads...")
+            extractor.downloads.cancel()
+            extractor.downloads.wait()
+        finally:
+            if extractor.driver_pool:
+                extractor.driver_pool.close()
+                extractor.driver_pool = None
+
+        synced = 0
+        for folder, anime, episodes, episode_list in updates:
+            done = self.finished(folder, anime, episode_list)
+            if len(done) < len(episode_list):
+                print(
+                    f"{Fore.LIGHTYELLOW_EX}{len(episode_list) - len(done)} episode(s) of {anime.name}"
+                    " did not finish, the next sync tries them again"
+                )
+            synced += len(done) == len(episode_list)
+            episodes.update({episode["number"]: episode for episode in done})
+            extractor.write_anime_json(folder, anime, [episodes[number] for number in sorted(episodes)])
+
+        print(f"\n{Fore.LIGHTGREEN_EX}Synced {synced} of {len(series)} series")
@@ -0,0 +1,27 @@
+import importlib
+import re
+
+# (url pattern, module, class), checked in order. Modules are only imported once a link
+# matches, so a plain yt-dlp download never loads selenium, langdetect or gallery_dl.
+EXTRACTORS: list[tuple[str, str, str]] = [
+    (r"hianime", "extractors.hianime", "HianimeExtractor"),
+    (r"instagram\.com", "extractors.instagram", "InstagramExtractor"),
+]
+DEFAULT_EXTRACTOR: tuple[str, str] = ("extractors.general", "GeneralExtractor")
+
+
+def load_extractor(module: str, name: str) -> type:
+    return getattr(importlib.import_module(module), name)
+
+
+def find_extractor(link: str) -> type:
+    """The extractor class for `link`, GeneralExtractor when no pattern matches."""
+    for pattern, module, name in EXTRACTORS:
+        if re.search(pattern, link, re.IGNORECASE):
+            return load_extractor(module, name)
+    return load_extractor(*DEFAULT_EXTRACTOR)
+
+
+def hianime_extractor() -> type:
+    """HianimeExtractor, used for searches by name."""
+    return load_extractor("extractors.hianime", "HianimeExtractor")
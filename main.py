@@ -5,16 +5,62 @@ import time
 
 from colorama import Fore
 
-from extractors.general import GeneralExtractor
-from extractors.hianime import HianimeExtractor
-from extractors.instagram import InstagramExtractor
+from extractors.registry import find_extractor, hianime_extractor, load_extractor
 
 
 class Main:
     def __init__(self):
         self.args = self.parse_args()
-        extractor = self.get_extractor()
-        extractor.run()
+        if self.args.convert_vtt:
+            self.convert_subtitles(self.args.convert_vtt)
+            return
+        if self.args.batch:
+            extractor = load_extractor("extractors.hianime_batch", "HianimeBatch")(self.args, self.args.batch)
+        elif self.args.sync:
+            extractor = load_extractor("extractors.hianime_sync", "HianimeSync")(self.args)
+        else:
+            extractor = self.get_extractor()
+        try:
+            extractor.run()
+        finally:
+            # only the hianime extractors hold browsers, worker threads and cache databases
+            close = getattr(extractor, "close", None)
+            if close:
+                close()
+            self.write_metrics()
+
+    def write_metrics(self):
+        """Write the per-stage timings, counters and peak memory of this run, if asked for."""
+        if not self.args.metrics_file and not self.args.prometheus_file:
+            return
+        # imported here so runs without metrics don't load psutil and requests for nothing
+        from tools.metrics import get_metrics, peak_rss
+        from tools.session import get_session
+
+        memory = peak_rss()
+        metrics = get_metrics()
+        if memory:
+            browser = metrics.peaks.get("browser_rss_bytes")
+            print(
+                f"{Fore.LIGHTBLACK_EX}Peak memory: {memory['self'] / 1024 / 1024:.0f} MiB"
+                + (f" (largest browser: {browser / 1024 / 1024:.0f} MiB)" if browser else "")
+            )
+
+        http_hosts = get_session().host_totals()
+        if self.args.metrics_file:
+            metrics.write_json(self.args.metrics_file, http_hosts)
+            print(f"{Fore.LIGHTBLACK_EX}Metrics written to {self.args.metrics_file}")
+        if self.args.prometheus_file:
+            metrics.write_prometheus(self.args.prometheus_file, http_hosts)
+
+    @staticmethod
+    def convert_subtitles(root: str):
+        """Convert an existing output tree's .vtt files to .srt without downloading anything."""
+        from tools.functions import convert_vtt_tree
+
+        print(f"{Fore.LIGHTGREEN_EX}Converting .vtt files under {root}...")
+        converted = convert_vtt_tree(root)
+        print(f"{Fore.LIGHTGREEN_EX}Converted {len(converted)} subtitle file(s)")
 
     def get_extractor(self):
         if not self.args.link and not self.args.filename:
@@ -25,16 +71,13 @@ class Main:
             if "http" in ans.lower():
                 self.args.link = ans
             else:
-                return HianimeExtractor(args=self.args, name=ans)
+                return hianime_extractor()(args=self.args, name=ans)
 
         if not self.args.link and self.args.filename:
-            return HianimeExtractor(args=self.args, name=self.args.filename)
+            return hianime_extractor()(args=self.args, name=self.args.filename)
 
-        if "hianime" in self.args.link:
-            return HianimeExtractor(args=self.args)
-        if "instagram.com" in self.args.link:
-            return InstagramExtractor(args=self.args)
-        return GeneralExtractor(args=self.args)
+        # only the matching extractor's module (and its dependencies) is imported
+        return find_extractor(self.args.link)(args=self.args)
 
     def load_config(self):
         """Load configuration from config.json file if it exists, otherwise use config.default.json."""
@@ -142,6 +185,115 @@ class Main:
             help="Max retries to find url"
         )
 
+        parser.add_argument(
+            "--drivers",
+            type=int,
+            default=config.get("drivers", 1),
+            help="Number of browser drivers capturing episodes in parallel"
+        )
+
+        parser.add_argument(
+            "--resolver",
+            type=str,
+            choices=["browser", "http"],
+            default=config.get("resolver", "browser"),
+            help="How to find episode streams, 'http' skips the browser and falls back to it on failure"
+        )
+
+        parser.add_argument(
+            "--max-resolution",
+            type=int,
+            default=config.get("max_resolution", None),
+            help="Highest video height to download, e.g. 720 (default: best available)"
+        )
+
+        parser.add_argument(
+            "--max-bitrate",
+            type=int,
+            default=config.get("max_bitrate", None),
+            help="Highest stream bitrate to download in kbps (default: best available)"
+        )
+
+        parser.add_argument(
+            "--downloader",
+            type=str,
+            choices=["yt-dlp", "native"],
+            default=config.get("downloader", "yt-dlp"),
+            help="Backend used to download episode streams"
+        )
+
+        parser.add_argument(
+            "--segment-workers",
+            type=int,
+            default=config.get("segment_workers", 8),
+            help="Concurrent segment requests per episode with the native downloader"
+        )
+
+        parser.add_argument(
+            "--max-downloads",
+            type=int,
+            default=config.get("max_downloads", 4),
+            help="Maximum number of episodes downloading at the same time"
+        )
+
+        parser.add_argument(
+            "--max-queued-downloads",
+            type=int,
+            default=config.get("max_queued_downloads", 2),
+            help="Captured episodes allowed to wait for a download slot before capture pauses"
+        )
+
+        parser.add_argument(
+            "--download-order",
+            type=str,
+            choices=["episode", "fifo"],
+            default=config.get("download_order", "episode"),
+            help="Order queued downloads by episode number or by capture order"
+        )
+
+        parser.add_argument(
+            "--cache-dir",
+            type=str,
+            default=config.get("cache_dir", ".cache"),
+            help="Directory for on-disk caches such as captured stream links"
+        )
+
+        parser.add_argument(
+            "--no-cache",
+            dest="cache_dir",
+            action="store_const",
+            const=None,
+            help="Disable all on-disk caches"
+        )
+
+        parser.add_argument(
+            "--search-pages",
+            type=int,
+            default=config.get("search_pages", 1),
+            help="Number of search result pages to list when searching by name"
+        )
+
+        parser.add_argument(
+            "--progress-file",
+            type=str,
+            default=config.get("progress_file", None),
+            help="Append JSON-lines download progress snapshots to this file"
+        )
+
+        parser.add_argument(
+            "--metrics-file",
+            type=str,
+            default=config.get("metrics_file", None),
+            help="Write per-stage timings and counters of the run to this JSON file"
+        )
+
+        parser.add_argument(
+            "--prometheus-file",
+            type=str,
+            default=config.get("prometheus_file", None),
+            help="Write the run metrics to this file in the Prometheus textfile format"
+        )
+
         parser.add_argument(
             "--json-file", 
             type=str, 
@@ -149,6 +301,21 @@ class Main:
             help="Path to a JSON file with episode data"
         )
 
+        parser.add_argument(
+            "--batch",
+            type=str,
+            default=None,
+            metavar="MANIFEST",
+            help="Download every series listed in a JSON manifest without prompting"
+        )
+
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            default=False,
+            help="Download the episodes released since the last run of every series in the output directory"
+        )
+
         parser.add_argument(
             "--download-all",  
             action="store_true", 
@@ -170,6 +337,13 @@ class Main:
             help="Searching for an OVA"
         )
 
+        parser.add_argument(
+            "--skip-existing",
+            action=argparse.BooleanOptionalAction,
+            default=config.get("skip_existing", True),
+            help="Skip episodes whose video file is already complete in the output folder (--no-skip-existing downloads them again)"
+        )
+
         parser.add_argument(
             "--srt-format",  
             action="store_true", 
@@ -177,6 +351,14 @@ class Main:
             help="Convert subtitle files to SRT format instead of VTT"
         )
 
+        parser.add_argument(
+            "--convert-vtt",
+            type=str,
+            default=None,
+            metavar="DIR",
+            help="Convert every .vtt file under DIR to .srt (skipping up to date ones) and exit"
+        )
+
         return parser.parse_args()
 
 
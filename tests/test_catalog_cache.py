@@ -0,0 +1,47 @@
+import time
+
+from tools import catalog_cache
+from tools.catalog_cache import CatalogCache
+
+RECORD = {"name": "Show", "url": "https://hianime.test/show-1", "sub_episodes": 12, "dub_episodes": 0}
+
+
+def count(cache, table):
+    return cache._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_searches_and_pages_expire(tmp_path, monkeypatch):
+    cache = CatalogCache(str(tmp_path / "catalog.sqlite"), ttl=3600, page_ttl=86400)
+    cache.put("One  Piece!", 1, [RECORD])
+    cache.put_page(RECORD["url"], '"v1"', None, RECORD)
+    assert cache.get("one piece", 1) == [RECORD]
+    assert cache.get_page(RECORD["url"]) == {"etag": '"v1"', "last_modified": None, "record": RECORD}
+
+    now = time.time()
+    monkeypatch.setattr(catalog_cache.time, "time", lambda: now + 7200)
+    assert cache.get("one piece", 1) is None
+    # pages outlive search results
+    assert cache.get_page(RECORD["url"]) is not None
+    # a revalidated page starts a new max age
+    cache.put_page(RECORD["url"], '"v1"', None, RECORD)
+
+    monkeypatch.setattr(catalog_cache.time, "time", lambda: now + 86400 + 3600)
+    assert cache.get_page(RECORD["url"]) is not None
+    monkeypatch.setattr(catalog_cache.time, "time", lambda: now + 2 * 86400)
+    assert cache.get_page(RECORD["url"]) is None
+    cache.close()
+
+
+def test_expired_rows_are_purged_on_open(tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog.sqlite")
+    cache = CatalogCache(path, ttl=3600, page_ttl=86400)
+    cache.put("old", 1, [RECORD])
+    cache.put_page("https://hianime.test/old-1", None, "Mon, 01 Jan 2024 00:00:00 GMT", RECORD)
+    cache.close()
+
+    now = time.time()
+    monkeypatch.setattr(catalog_cache.time, "time", lambda: now + 2 * 86400)
+    cache = CatalogCache(path, ttl=3600, page_ttl=86400)
+    cache.put("new", 1, [RECORD])
+    assert (count(cache, "searches"), count(cache, "pages")) == (1, 0)
+    cache.close()
@@ -0,0 +1,32 @@
+import threading
+
+from tools.download_scheduler import DownloadScheduler
+
+
+def test_cancel_group_keeps_other_jobs():
+    scheduler = DownloadScheduler(max_workers=1)
+    gate = threading.Event()
+    done: list[str] = []
+    # occupy the only worker so the other jobs stay queued
+    scheduler.submit(gate.wait, group="first")
+    for name, group in (("a1", "first"), ("b1", "second"), ("a2", "first"), ("b2", "second")):
+        scheduler.submit(done.append, name, group=group)
+
+    scheduler.cancel("first")
+    assert scheduler.is_cancelled("first") and not scheduler.is_cancelled("second")
+    assert not scheduler.submit(done.append, "a3", group="first")
+    gate.set()
+    assert scheduler.wait(5)
+    assert done == ["b1", "b2"]
+
+
+def test_cancel_all():
+    scheduler = DownloadScheduler(max_workers=1)
+    gate = threading.Event()
+    done: list[str] = []
+    scheduler.submit(gate.wait)
+    scheduler.submit(done.append, "b1", group="second")
+    scheduler.cancel()
+    gate.set()
+    assert scheduler.wait(5)
+    assert done == [] and scheduler.is_cancelled("second")
@@ -0,0 +1,88 @@
+import _thread
+import threading
+import time
+
+import pytest
+
+from tools.driver_pool import DriverPool
+
+
+class StubDriver:
+    def __init__(self, name):
+        self.name = name
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(size):
+    pool = DriverPool(lambda: StubDriver(f"driver{len(pool.drivers)}"), size)
+    pool.start()
+    return pool
+
+
+def test_map_keeps_item_order_across_drivers():
+    pool = make_pool(3)
+    used = set()
+
+    def work(driver, item):
+        used.add(driver.name)
+        # later items finish first
+        time.sleep((10 - item) * 0.005)
+        return item * 2
+
+    assert pool.map(work, list(range(10))) == [item * 2 for item in range(10)]
+    assert len(used) == 3
+    pool.close()
+    assert not pool.drivers
+
+
+def test_worker_exception_leaves_none_and_continues():
+    pool = make_pool(2)
+
+    def work(driver, item):
+        if item == 1:
+            raise RuntimeError("capture failed")
+        return item
+
+    assert pool.map(work, [0, 1, 2, 3]) == [0, None, 2, 3]
+    # every driver went back to the pool
+    assert pool._idle.qsize() == 2
+
+
+def test_stop_skips_remaining_items():
+    pool = make_pool(1)
+    stop = threading.Event()
+
+    def work(driver, item):
+        if item == 1:
+            stop.set()
+        return item
+
+    assert pool.map(work, [0, 1, 2, 3], stop) == [0, 1, None, None]
+
+
+def test_interrupt_waits_for_running_items():
+    pool = make_pool(2)
+    stop = threading.Event()
+    finished = []
+    both_running = threading.Barrier(2)
+
+    def work(driver, item):
+        if item < 2:
+            both_running.wait(5)
+        if item == 0:
+            _thread.interrupt_main()
+        # the running items only finish after the interrupt reached map
+        stop.wait(5)
+        time.sleep(0.3)
+        finished.append(item)
+        return item
+
+    with pytest.raises(KeyboardInterrupt):
+        pool.map(work, list(range(6)), stop)
+    assert stop.is_set()
+    # both running items completed before map raised, nothing new was started
+    assert sorted(finished) == [0, 1]
+    assert pool._idle.qsize() == 2
@@ -0,0 +1,51 @@
+import time
+
+from benchmarks.fake_site import series_page_html
+from tools.episode_index import EpisodeIndex, parse_episode_links
+
+BASE_URL = "https://hianime.example"
+
+
+def test_parse_episode_links_range_and_attributes():
+    page = (
+        '<a title="Tom &amp; Jerry > 1" data-number="1" href="/watch/show-1?ep=11">1</a>'
+        "<a data-number='2' href='/watch/show-1?ep=12' title='Two'>2</a>"
+        '<a data-number="3" href="/watch/show-1?ep=13">3</a>'
+        '<a href="/home">Home</a>'
+    )
+    assert parse_episode_links(page, BASE_URL, 1, 2) == [
+        {"url": f"{BASE_URL}/watch/show-1?ep=11", "number": 1, "title": "Tom & Jerry > 1"},
+        {"url": f"{BASE_URL}/watch/show-1?ep=12", "number": 2, "title": "Two"},
+    ]
+
+
+def test_parse_episode_links_rendered_page():
+    episodes = parse_episode_links(series_page_html(1000), BASE_URL, 10, 20)
+    assert [episode["number"] for episode in episodes] == list(range(10, 21))
+
+
+def test_parse_episode_links_pathological_markup_is_fast():
+    # unterminated tags and unbalanced quotes used to backtrack exponentially
+    pages = [
+        "<a " + "x" * 5000,
+        '<a x="' + "y" * 5000,
+        "<a " + 'x"' * 2000,
+        ("<a " + "a='1' " * 50 + '"') * 200,
+        ('<script>var s = "<a " + \'' + "z" * 1000 + "</script>") * 200,
+    ]
+    for page in pages:
+        started = time.perf_counter()
+        assert parse_episode_links(page + series_page_html(5, filler=0), BASE_URL) != []
+        assert time.perf_counter() - started < 1
+
+
+def test_episode_index_expires(tmp_path):
+    index = EpisodeIndex(str(tmp_path / "episodes.sqlite"), ttl=60)
+    episodes = [{"url": f"{BASE_URL}/watch/show-1?ep={n}", "number": n, "title": None} for n in range(1, 4)]
+    index.put("show-1", episodes)
+    assert index.get("show-1", 2, 3) == episodes[1:]
+    assert index.get("show-1", 1, 4) is None
+
+    index.ttl = -1
+    assert index.get("show-1", 1, 3) is None
+    index.close()
@@ -0,0 +1,75 @@
+import pytest
+import requests
+
+from benchmarks.fake_site import ANIME_SLUG, FakeSite
+from extractors.hianime_http import HianimeHttpResolver
+
+
+@pytest.fixture
+def site():
+    with FakeSite(episodes=12) as site:
+        yield site
+
+
+def make_resolver(site: FakeSite) -> HianimeHttpResolver:
+    # a session without urllib3 retries, the 500s of broken endpoints come back at once
+    return HianimeHttpResolver(site.url, {"User-Agent": "test"}, requests.Session())
+
+
+def episode(site: FakeSite, number: int) -> dict:
+    return {"url": f"{site.url}/watch/{ANIME_SLUG}?ep={1000 + number}", "number": number, "title": f"Episode {number}"}
+
+
+def test_get_episode_urls(site):
+    episodes = make_resolver(site).get_episode_urls(f"{site.url}/watch/{ANIME_SLUG}", 3, 5)
+    assert episodes == [episode(site, number) for number in (3, 4, 5)]
+
+
+def test_get_episode_urls_falls_back_when_the_list_fails(site):
+    resolver = make_resolver(site)
+    # no numeric id in the url
+    assert resolver.get_episode_urls(f"{site.url}/watch/no-id", 1, 12) is None
+    site.broken = (r"/ajax/v2/episode/list/\d+",)
+    assert resolver.get_episode_urls(f"{site.url}/watch/{ANIME_SLUG}", 1, 12) is None
+
+
+def test_resolve_embed(site):
+    sources = make_resolver(site).resolve_embed(f"{site.url}/embed-2/e-1/1001?k=1")
+    assert sources["m3u8"] == f"{site.url}/hls/1001/master.m3u8"
+    assert [track["file"] for track in sources["tracks"]] == [f"{site.url}/subs/1001.vtt"]
+    assert sources["headers"]["Referer"] == f"{site.url}/"
+
+
+def test_resolve_embed_rejects_encrypted_and_failed_sources(site):
+    resolver = make_resolver(site)
+    site.encrypted = True
+    assert resolver.resolve_embed(f"{site.url}/embed-2/e-1/1001?k=1") is None
+    site.encrypted = False
+    site.broken = (r"/embed-2/e-1/getSources\?id=1001",)
+    assert resolver.resolve_embed(f"{site.url}/embed-2/e-1/1001?k=1") is None
+
+
+def test_resolve_prefers_the_requested_server(site):
+    urls = make_resolver(site).resolve(episode(site, 1), "dub", ["HD-2"])
+    assert urls == {
+        "m3u8": f"{site.url}/hls/1001/master.m3u8",
+        "headers": urls["headers"],
+        "server": "HD-2",
+        "all-vtt": [f"{site.url}/subs/1001.vtt"],
+        "vtt": f"{site.url}/subs/1001.vtt",
+    }
+
+
+def test_resolve_falls_back_to_the_next_server(site):
+    site.broken = (r"/ajax/v2/episode/sources\?id=1001-sub-1",)
+    urls = make_resolver(site).resolve(episode(site, 1), "sub", ["HD-1", "HD-2"])
+    assert urls["server"] == "HD-2"
+
+
+def test_resolve_gives_up_for_the_browser(site):
+    resolver = make_resolver(site)
+    site.encrypted = True
+    assert resolver.resolve(episode(site, 1), "sub", ["HD-1"]) is None
+    site.encrypted = False
+    site.broken = (r"/ajax/v2/episode/servers\?episodeId=\d+",)
+    assert resolver.resolve(episode(site, 1), "sub", ["HD-1"]) is None
@@ -0,0 +1,86 @@
+from tools.hls import Variant, parse_master, parse_media, select_variant
+
+MASTER = """#EXTM3U
+#EXT-X-MEDIA:TYPE=SUBTITLES,GROUP-ID="subs",NAME="English",URI="subs/en.m3u8"
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360,CODECS="avc1.4d401e,mp4a.40.2"
+360/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=2800000,RESOLUTION=1280x720
+/hls/720/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=5000000,RESOLUTION=1920x1080
+https://other.test/1080/index.m3u8
+#EXT-X-I-FRAME-STREAM-INF:BANDWIDTH=100000,URI="iframe.m3u8"
+"""
+
+
+def test_parse_master_resolves_relative_uris():
+    master = parse_master(MASTER, "https://cdn.test/hls/master.m3u8")
+    assert not master.is_media
+    assert [v.url for v in master.variants] == [
+        "https://cdn.test/hls/360/index.m3u8",
+        "https://cdn.test/hls/720/index.m3u8",
+        "https://other.test/1080/index.m3u8",
+    ]
+    first = master.variants[0]
+    assert (first.bandwidth, first.width, first.height) == (800000, 640, 360)
+    # quoted attribute values keep their commas
+    assert first.codecs == "avc1.4d401e,mp4a.40.2"
+
+
+def test_parse_master_without_resolution():
+    master = parse_master("#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=1000\na.m3u8\n", "https://cdn.test/x/master.m3u8")
+    assert master.variants == [Variant("https://cdn.test/x/a.m3u8", 1000, None, None, "")]
+
+
+def test_parse_master_fallbacks():
+    # no STREAM-INF attributes: the first non-iframe playlist
+    master = parse_master("#EXTM3U\niframe.m3u8\nmain.m3u8\nother.m3u8\n", "https://cdn.test/master.m3u8")
+    assert [v.url for v in master.variants] == ["https://cdn.test/main.m3u8"]
+    # a media playlist is reported as such
+    media = parse_master("#EXTM3U\n#EXTINF:4.0,\nseg0.ts\n#EXT-X-ENDLIST\n", "https://cdn.test/index.m3u8")
+    assert media.is_media and not media.variants
+
+
+def test_select_variant_caps():
+    variants = parse_master(MASTER, "https://cdn.test/hls/master.m3u8").variants
+    assert select_variant(variants).height == 1080
+    assert select_variant(variants, max_height=720).height == 720
+    assert select_variant(variants, max_bandwidth=3_000_000).height == 720
+    assert select_variant(variants, max_height=1080, max_bandwidth=1_000_000).height == 360
+    # nothing fits: the smallest variant rather than none
+    assert select_variant(variants, max_height=240).height == 360
+    assert select_variant([]) is None
+
+
+def test_select_variant_without_resolution():
+    variants = [Variant("a", 500_000), Variant("b", 3_000_000), Variant("c", 1_000_000, 1280, 720)]
+    # unknown heights pass the resolution cap and rank by bandwidth below known ones
+    assert select_variant(variants, max_height=480).url == "b"
+    assert select_variant(variants).url == "c"
+    assert select_variant(variants, max_bandwidth=800_000).url == "a"
+
+
+def test_parse_media_keys_and_byte_ranges():
+    media = parse_media(
+        "\n".join(
+            [
+                "#EXTM3U",
+                "#EXT-X-MEDIA-SEQUENCE:5",
+                '#EXT-X-MAP:URI="init.mp4"',
+                '#EXT-X-KEY:METHOD=AES-128,URI="key.bin",IV=0x000102030405060708090a0b0c0d0e0f',
+                "#EXTINF:4.0,",
+                "#EXT-X-BYTERANGE:1000@0",
+                "seg.m4s",
+                "#EXT-X-KEY:METHOD=NONE",
+                "#EXTINF:2.5,",
+                "seg1.m4s",
+                "#EXT-X-ENDLIST",
+            ]
+        ),
+        "https://cdn.test/a/index.m3u8",
+    )
+    assert media.init_url == "https://cdn.test/a/init.mp4"
+    assert media.duration == 6.5
+    first, second = media.segments
+    assert (first.sequence, first.byte_range, first.key.url) == (5, (1000, 0), "https://cdn.test/a/key.bin")
+    assert first.key.iv == bytes(range(16))
+    assert second.sequence == 6 and second.key is None
@@ -0,0 +1,145 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from benchmarks.fake_site import FakeSite
+from tools.hls_downloader import HlsDownloader
+
+
+@pytest.fixture
+def static_server(tmp_path):
+    """Serves the files of tmp_path/www over HTTP."""
+    root = tmp_path / "www"
+    root.mkdir()
+
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield root, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_writes_segments_in_order(tmp_path):
+    progress = []
+    with FakeSite(segments=12, segment_size=64 * 1024, error_rate=0.2) as site:
+        location = str(tmp_path / "episode.mp4")
+        downloader = HlsDownloader(workers=4)
+        assert downloader.download(f"{site.url}/hls/1001/720/index.m3u8", location, {}, [progress.append])
+        expected = site._segment[: site.segment_size] * site.segments
+
+    with open(location, "rb") as f:
+        assert f.read() == expected
+    assert not os.path.exists(location + ".part")
+    assert [p["fragment_index"] for p in progress if p["status"] == "downloading"] == list(range(1, 13))
+    assert progress[-1]["status"] == "finished"
+
+
+def test_download_decrypts_aes_128(static_server, tmp_path):
+    root, url = static_server
+    key, iv = bytes(range(16)), bytes(16)
+    plain = [bytes([i]) * 1000 for i in range(3)]
+    for i, data in enumerate(plain):
+        padding = 16 - len(data) % 16
+        encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+        (root / f"seg{i}.ts").write_bytes(encryptor.update(data + bytes([padding]) * padding) + encryptor.finalize())
+    (root / "key.bin").write_bytes(key)
+    playlist = "\n".join(
+        ["#EXTM3U", "#EXT-X-TARGETDURATION:4", f'#EXT-X-KEY:METHOD=AES-128,URI="key.bin",IV=0x{iv.hex()}']
+        + [line for i in range(3) for line in ("#EXTINF:4.0,", f"seg{i}.ts")]
+        + ["#EXT-X-ENDLIST"]
+    )
+
+    location = str(tmp_path / "episode.ts")
+    assert HlsDownloader(workers=2).download(f"{url}/index.m3u8", location, {}, playlist=playlist)
+    with open(location, "rb") as f:
+        assert f.read() == b"".join(plain)
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg") or not shutil.which("ffprobe"), reason="needs ffmpeg")
+def test_mpeg_ts_is_remuxed_into_mp4(static_server, tmp_path):
+    root, url = static_server
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=duration=4:size=128x72:rate=10",
+            "-c:v", "mpeg2video", "-f", "segment", "-segment_time", "1", "-segment_format", "mpegts",
+            str(root / "seg%d.ts"),
+        ],
+        check=True,
+    )
+    segments = sorted(os.listdir(root), key=lambda name: int(name[3:-3]))
+    playlist = "\n".join(
+        ["#EXTM3U", "#EXT-X-TARGETDURATION:1"]
+        + [line for name in segments for line in ("#EXTINF:1.0,", name)]
+        + ["#EXT-X-ENDLIST"]
+    )
+
+    location = str(tmp_path / "episode.mp4")
+    assert HlsDownloader().download(f"{url}/index.m3u8", location, {}, playlist=playlist)
+    format_name = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=format_name", "-of", "csv=p=0", location],
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert "mp4" in format_name
+    assert not os.path.exists(location + ".part")
+
+
+def write_playlist(root, count):
+    for i in range(count):
+        (root / f"seg{i}.ts").write_bytes(bytes([i]) * 1000)
+    return "\n".join(
+        ["#EXTM3U", "#EXT-X-TARGETDURATION:4"]
+        + [line for i in range(count) for line in ("#EXTINF:4.0,", f"seg{i}.ts")]
+        + ["#EXT-X-ENDLIST"]
+    )
+
+
+def test_interrupted_download_resumes_from_part(static_server, tmp_path):
+    root, url = static_server
+    playlist = write_playlist(root, 4)
+    location = str(tmp_path / "episode.ts")
+
+    def cancel_after_two(d):
+        if d["status"] == "downloading" and d["fragment_index"] == 2:
+            raise KeyboardInterrupt
+
+    assert not HlsDownloader(workers=1).download(f"{url}/index.m3u8", location, {}, [cancel_after_two], playlist)
+    assert os.path.getsize(location + ".part") == 2000
+    assert os.path.exists(location + ".part.json")
+
+    # the written segments are gone from the server, so they can't be fetched again
+    (root / "seg0.ts").unlink()
+    (root / "seg1.ts").unlink()
+    progress = []
+    assert HlsDownloader(workers=2, retries=0).download(f"{url}/index.m3u8", location, {}, [progress.append], playlist)
+    with open(location, "rb") as f:
+        assert f.read() == b"".join(bytes([i]) * 1000 for i in range(4))
+    assert not os.path.exists(location + ".part.json")
+    assert [p["fragment_index"] for p in progress if p["status"] == "downloading"] == [3, 4]
+
+
+def test_cancel_does_not_wait_for_segment_retries(static_server, tmp_path):
+    root, url = static_server
+    playlist = write_playlist(root, 3)
+    (root / "seg0.ts").unlink()
+    location = str(tmp_path / "episode.ts")
+
+    def cancel(d):
+        raise KeyboardInterrupt
+
+    started = time.monotonic()
+    assert not HlsDownloader(workers=2, retries=10).download(f"{url}/index.m3u8", location, {}, [cancel], playlist)
+    # seg0 keeps failing with 404, its retries alone would take over a minute
+    assert time.monotonic() - started < 3
+    assert not os.path.exists(location + ".part.json")
@@ -0,0 +1,52 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools import jikan
+from tools.jikan import JikanClient
+
+
+@pytest.fixture
+def jikan_server(monkeypatch):
+    """A local Jikan that throttles the first `throttled` requests."""
+    state = {"requests": 0, "throttled": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            if state["requests"] <= state["throttled"]:
+                body, status = b"{}", 429
+            else:
+                body, status = json.dumps({"data": [{"aired": {"from": "2011-04-06T00:00:00+00:00"}}]}).encode(), 200
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(jikan, "JIKAN_ANIME_URL", f"http://127.0.0.1:{server.server_address[1]}/v4/anime")
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_throttled_lookups_send_one_request_per_attempt(jikan_server):
+    jikan_server["throttled"] = 100
+    client = JikanClient(rate=50, retries=3)
+    assert client.get_year("Steins;Gate") is None
+    assert jikan_server["requests"] == 3
+
+
+def test_year_is_cached(jikan_server, tmp_path):
+    jikan_server["throttled"] = 1
+    client = JikanClient(str(tmp_path / "jikan.sqlite"), rate=50)
+    assert client.get_year("Steins;Gate") == "2011"
+    assert client.get_year("steins gate") == "2011"
+    assert jikan_server["requests"] == 2
+    client.close()
@@ -0,0 +1,48 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from tools.metrics import Metrics, process_tree_rss
+
+
+def test_prometheus_keeps_large_totals_exact(tmp_path):
+    metrics = Metrics()
+    metrics.count("download_bytes", 1_234_567_890)
+    metrics.count("download_bytes", 1_234_567_891)
+    metrics.record("download", 1.5)
+    path = tmp_path / "hianime.prom"
+    hosts = {"cdn.example": {"requests": 1_000_001, "errors": 3, "seconds": 12.345678, "bytes": 9_876_543_210}}
+    metrics.write_prometheus(str(path), hosts)
+
+    lines = path.read_text().splitlines()
+    assert "hianime_download_bytes_total 2469135781" in lines
+    assert 'hianime_http_requests_total{host="cdn.example"} 1000001' in lines
+    assert 'hianime_http_bytes_total{host="cdn.example"} 9876543210' in lines
+    assert 'hianime_http_seconds_total{host="cdn.example"} 12.345678' in lines
+    assert 'hianime_stage_seconds_count{stage="download"} 1' in lines
+
+
+def test_process_tree_rss_includes_grandchildren():
+    psutil = pytest.importorskip("psutil")
+    # like chromedriver starting Chrome: the child of the child holds most of the memory
+    script = (
+        "import subprocess, sys, time;"
+        "subprocess.Popen([sys.executable, '-c', 'import time; data = bytearray(64 * 2**20); time.sleep(30)']);"
+        "time.sleep(30)"
+    )
+    parent = subprocess.Popen([sys.executable, "-c", script])
+    try:
+        deadline = time.monotonic() + 10
+        rss = 0
+        while time.monotonic() < deadline and rss < 64 * 2**20:
+            time.sleep(0.1)
+            rss = process_tree_rss(parent.pid) or 0
+        assert rss >= 64 * 2**20
+        assert psutil.Process(parent.pid).memory_info().rss < 64 * 2**20
+    finally:
+        for child in psutil.Process(parent.pid).children(recursive=True):
+            child.kill()
+        parent.kill()
+        parent.wait()
@@ -0,0 +1,90 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from tools import progress
+from tools.progress import ProgressAggregator, format_bytes, format_seconds
+
+MiB = 1024 * 1024
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the time module of tools.progress with a manually advanced clock."""
+    fake = SimpleNamespace(now=100.0)
+    fake.monotonic = lambda: fake.now
+    fake.time = lambda: 1_700_000_000.0
+    monkeypatch.setattr(progress, "time", fake)
+    return fake
+
+
+def downloading(done, total=None, estimate=None, speed=None):
+    return {
+        "status": "downloading",
+        "downloaded_bytes": done,
+        "total_bytes": total,
+        "total_bytes_estimate": estimate,
+        "speed": speed,
+        "fragment_index": 1,
+        "fragment_count": 10,
+    }
+
+
+def test_snapshot_totals_and_eta(clock):
+    queued = [2]
+    aggregator = ProgressAggregator(queued=lambda: queued[0])
+    aggregator.update("e1", downloading(40 * MiB, total=100 * MiB, speed=2 * MiB))
+    aggregator.update("e2", downloading(10 * MiB, estimate=50 * MiB, speed=1 * MiB))
+    aggregator.update("e3", downloading(5 * MiB, speed=1 * MiB))
+
+    snap = aggregator.snapshot()
+    assert (snap["active"], snap["finished"], snap["queued"]) == (3, 0, 2)
+    assert snap["downloaded_bytes"] == 55 * MiB
+    # unknown totals count as what is downloaded so far, nothing finished yet to estimate queued ones
+    assert snap["remaining_bytes"] == 100 * MiB
+    assert snap["speed"] == 4 * MiB
+    assert snap["eta"] == 25
+    assert snap["time"] == 1_700_000_000.0
+
+    aggregator.update("e1", {"status": "finished", "total_bytes": 120 * MiB})
+    aggregator.update("e3", {"status": "error"})
+    snap = aggregator.snapshot()
+    assert (snap["active"], snap["finished"]) == (1, 1)
+    assert snap["downloaded_bytes"] == 130 * MiB
+    # e2 still has 40 MiB to go, the two queued episodes are estimated at the 120 MiB average
+    assert snap["remaining_bytes"] == 280 * MiB
+    assert snap["eta"] == 280
+    assert set(snap["episodes"]) == {"e2"}
+
+    queued[0] = 0
+    aggregator.update("e2", {"status": "finished", "downloaded_bytes": 50 * MiB})
+    snap = aggregator.snapshot()
+    assert (snap["remaining_bytes"], snap["speed"], snap["eta"]) == (0, 0, None)
+    assert aggregator.finished == {"e1": 120 * MiB, "e2": 50 * MiB}
+    assert "ETA --" in aggregator.format_line()
+
+
+def test_jsonl_is_rate_limited(clock, tmp_path):
+    path = tmp_path / "progress.jsonl"
+    aggregator = ProgressAggregator(str(path), interval=1.0)
+
+    aggregator.update("e1", downloading(1, speed=1))
+    clock.now += 0.5
+    aggregator.update("e1", downloading(2, speed=1))
+    clock.now += 0.6
+    aggregator.update("e1", downloading(3, speed=1))
+    clock.now += 0.1
+    # finished episodes are always written
+    aggregator.update("e1", {"status": "finished", "downloaded_bytes": 3})
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["downloaded_bytes"] for line in lines] == [1, 3, 3]
+    assert [line["finished"] for line in lines] == [0, 0, 1]
+
+
+def test_formatting():
+    assert format_bytes(512) == "512.0B"
+    assert format_bytes(1536 * MiB) == "1.5GiB"
+    assert format_seconds(None) == "--"
+    assert format_seconds(125) == "2m 5s"
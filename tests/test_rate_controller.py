@@ -0,0 +1,24 @@
+import time
+
+from tools.rate_controller import HostRateController
+
+URL = "https://cdn.example/hls/seg1.ts"
+
+
+def test_new_host_starts_unthrottled():
+    controller = HostRateController(max_rate=32)
+    started = time.monotonic()
+    for _ in range(32):
+        controller.acquire(URL)
+    assert time.monotonic() - started < 0.1
+    assert controller.rate(URL) == 32
+
+
+def test_throttling_halves_once_per_cooldown():
+    controller = HostRateController(max_rate=32, cooldown=60)
+    controller.report(URL, 200)
+    controller.report(URL, 429)
+    controller.report(URL, 503)
+    assert controller.rate(URL) == 16
+    controller.report(URL, 200)
+    assert controller.rate(URL) > 16
@@ -0,0 +1,85 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from tools.request_scanner import RequestScanner, purge_requests
+
+
+class StubDriver:
+    """Just the selenium-wire attributes RequestScanner uses."""
+
+    def __init__(self, requests=(), scopes=None):
+        self._requests = list(requests)
+        self.scopes = scopes or []
+
+    @property
+    def requests(self):
+        return list(self._requests)
+
+    @requests.deleter
+    def requests(self):
+        self._requests.clear()
+
+    def respond(self, url, headers=None):
+        request = SimpleNamespace(url=url, headers=headers or {}, response=SimpleNamespace(status_code=200))
+        self._requests.append(request)
+        interceptor = getattr(self, "response_interceptor", None)
+        if interceptor:
+            interceptor(request, request.response)
+
+
+SCOPES = [r"(?i)\.m3u8", r"(?i)\.vtt"]
+
+
+def test_records_matching_responses_once():
+    earlier = SimpleNamespace(url="https://cdn.test/Master.m3u8", headers={"Referer": "r"}, response=object())
+    pending = SimpleNamespace(url="https://cdn.test/pending.m3u8", headers={}, response=None)
+    driver = StubDriver([earlier, pending], SCOPES)
+    scanner = RequestScanner(driver)
+
+    # requests that completed before the scanner existed are picked up, lowercased
+    assert scanner.wait(0.1) == [("https://cdn.test/master.m3u8", {"Referer": "r"})]
+
+    driver.respond("https://cdn.test/index.m3u8")
+    driver.respond("https://cdn.test/app.js")
+    driver.respond("https://cdn.test/eng-2.vtt")
+    driver.respond("https://cdn.test/index.m3u8")
+    assert [url for url, _ in scanner.wait(0.1)] == ["https://cdn.test/index.m3u8", "https://cdn.test/eng-2.vtt"]
+    assert scanner.wait(0.05) == []
+
+    purge_requests(driver)
+    assert driver.requests == []
+
+
+def test_wait_wakes_on_response_and_notify():
+    driver = StubDriver(scopes=SCOPES)
+    scanner = RequestScanner(driver)
+
+    threading.Timer(0.05, driver.respond, ["https://cdn.test/a.m3u8"]).start()
+    started = time.monotonic()
+    assert [url for url, _ in scanner.wait(5)] == ["https://cdn.test/a.m3u8"]
+    assert time.monotonic() - started < 1
+
+    threading.Timer(0.05, scanner.notify).start()
+    started = time.monotonic()
+    assert scanner.wait(5) == []
+    assert time.monotonic() - started < 1
+
+
+def test_close_restores_previous_interceptor():
+    forwarded = []
+    driver = StubDriver(scopes=SCOPES)
+    driver.response_interceptor = lambda request, response: forwarded.append(request.url)
+    previous = driver.response_interceptor
+
+    scanner = RequestScanner(driver)
+    driver.respond("https://cdn.test/a.m3u8")
+    # the previous interceptor still sees every response
+    assert forwarded == ["https://cdn.test/a.m3u8"]
+    scanner.close()
+    assert driver.response_interceptor is previous
+
+    bare = StubDriver()
+    scanner = RequestScanner(bare)
+    scanner.close()
+    assert not hasattr(bare, "response_interceptor")
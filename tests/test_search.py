@@ -0,0 +1,10 @@
+from benchmarks.fake_site import ANIME_NAME, ANIME_SLUG, FakeSite
+from benchmarks.run import make_args, make_extractor
+
+
+def test_search_results_ignore_sidebar_cards(tmp_path):
+    with FakeSite(episodes=12) as site:
+        extractor = make_extractor(site, make_args(str(tmp_path)))
+        assert extractor.fetch_search_page("bench") == [
+            {"name": ANIME_NAME, "url": f"{site.url}/{ANIME_SLUG}", "sub_episodes": 12, "dub_episodes": 12}
+        ]
@@ -0,0 +1,24 @@
+from benchmarks.fake_site import FakeSite
+from tools.session import TimedSession
+
+
+def test_exhausted_retries_return_the_response():
+    with FakeSite(error_rate=1.0) as site:
+        session = TimedSession(retries=1, recent=2)
+        session.adapters["http://"].max_retries.backoff_factor = 0
+        response = session.get(f"{site.url}/hls/1001/master.m3u8")
+        assert response.status_code == 503
+        # one attempt plus one retry
+        assert site.requests == 2
+
+
+def test_timings_are_bounded_and_totals_kept():
+    with FakeSite() as site:
+        session = TimedSession(recent=2)
+        for _ in range(5):
+            session.get(f"{site.url}/search")
+        session.get(f"{site.url}/missing")
+        assert len(session.timings) == 2
+        host = site.url.split("//")[1]
+        assert session.host_totals()[host]["requests"] == 6
+        assert session.host_totals()[host]["errors"] == 1
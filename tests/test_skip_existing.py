@@ -0,0 +1,17 @@
+from benchmarks.run import make_args
+from extractors.hianime import HianimeExtractor
+
+
+def test_unverifiable_files_are_not_skipped(tmp_path):
+    extractor = HianimeExtractor(args=make_args(str(tmp_path), cache_dir=None, skip_existing=True))
+    path = tmp_path / "s01e01 - Episode 1.mp4"
+    path.write_bytes(b"\0" * 2 * 1024 * 1024)
+
+    # a file of plausible size is not enough without a recorded size or duration
+    assert not extractor.is_downloaded(str(path))
+    assert not extractor.is_downloaded(str(path), {"number": 1, "title": "Episode 1"})
+    assert extractor.is_downloaded(str(path), {"filesize": 2 * 1024 * 1024})
+    assert not extractor.is_downloaded(str(path), {"filesize": 4 * 1024 * 1024})
+
+    (tmp_path / "s01e01 - Episode 1.mp4.part").write_bytes(b"")
+    assert not extractor.is_downloaded(str(path), {"filesize": 2 * 1024 * 1024})
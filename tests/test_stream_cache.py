@@ -0,0 +1,115 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools import stream_cache
+from tools.stream_cache import StreamCache, infer_expiry, is_url_alive
+
+
+def test_infer_expiry_reads_signed_url_params():
+    assert infer_expiry("https://cdn.test/a.m3u8?expires=1900000000&sig=x") == 1900000000.0
+    # milliseconds and parameter case
+    assert infer_expiry("https://cdn.test/a.m3u8?Expires=1900000000000") == 1900000000.0
+    assert infer_expiry("https://cdn.test/a.m3u8?X-Amz-Date=20300101T000000Z&X-Amz-Expires=3600") == 1893459600.0
+    assert infer_expiry("https://cdn.test/a.m3u8?X-Amz-Date=bad&X-Amz-Expires=3600") is None
+    # small numbers are not timestamps
+    assert infer_expiry("https://cdn.test/a.m3u8?e=42") is None
+    assert infer_expiry("https://cdn.test/a.m3u8") is None
+
+
+@pytest.fixture
+def origin():
+    """HTTP server answering HEAD with `head_status` and GET with `get_status`, recording the methods."""
+
+    class Handler(BaseHTTPRequestHandler):
+        head_status = 200
+        get_status = 200
+        methods: list[str] = []
+
+        def do_HEAD(self):
+            self.methods.append("HEAD")
+            self.send_response(self.head_status)
+            self.end_headers()
+
+        def do_GET(self):
+            self.methods.append("GET")
+            self.send_response(self.get_status)
+            self.send_header("Content-Length", "4")
+            self.end_headers()
+            self.wfile.write(b"#EXT")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield Handler, f"http://127.0.0.1:{server.server_address[1]}/index.m3u8"
+    server.shutdown()
+    server.server_close()
+
+
+def test_is_url_alive_falls_back_to_get(origin):
+    handler, url = origin
+    assert is_url_alive(url, {})
+    assert handler.methods == ["HEAD"]
+
+    handler.methods.clear()
+    handler.head_status = 405
+    assert is_url_alive(url, {})
+    assert handler.methods == ["HEAD", "GET"]
+
+    handler.get_status = 404
+    assert not is_url_alive(url, {})
+    assert not is_url_alive("not a url", {})
+
+
+def media(m3u8, server="HD-1"):
+    return {"m3u8": m3u8, "vtt": "https://cdn.test/en.vtt", "headers": {"Referer": "x"}, "server": server, "number": 1}
+
+
+def test_round_trip_prefers_servers_in_order(tmp_path):
+    cache = StreamCache(str(tmp_path / "cache" / "streams.db"))
+    signed = f"https://cdn.test/a.m3u8?expires={int(time.time()) + 3600}"
+    cache.put("ep-1", "HD-1", "sub", media(signed))
+    cache.put("ep-1", "HD-2", "sub", media(signed + "&b", "HD-2"))
+
+    entry = cache.get("ep-1", "sub")
+    # only the stream fields are stored
+    assert "number" not in entry and entry["headers"] == {"Referer": "x"}
+    assert cache.get("ep-1", "sub", ["hd-2", "HD-1"])["server"] == "HD-2"
+    assert cache.get("ep-1", "sub", ["HD-1"])["server"] == "HD-1"
+    assert cache.get("ep-1", "sub", ["HD-3"]) is None
+    assert cache.get("ep-1", "dub") is None
+    cache.close()
+
+
+def test_expired_entries_are_removed(tmp_path, monkeypatch):
+    checked = []
+    monkeypatch.setattr(stream_cache, "is_url_alive", lambda url, headers: checked.append(url) or False)
+    cache = StreamCache(str(tmp_path / "streams.db"), margin=60, check_after=600, max_age=86400)
+
+    # signed url inside the safety margin
+    cache.put("ep-1", "HD-1", "sub", media(f"https://cdn.test/a.m3u8?expires={int(time.time()) + 30}"))
+    assert cache.get("ep-1", "sub") is None
+
+    # unsigned url: trusted while young, checked over HTTP once older than check_after
+    cache.put("ep-2", "HD-1", "sub", media("https://cdn.test/b.m3u8"))
+    assert cache.get("ep-2", "sub") is not None
+    assert not checked
+    now = time.time()
+    monkeypatch.setattr(stream_cache.time, "time", lambda: now + 700)
+    assert cache.get("ep-2", "sub") is None
+    assert checked == ["https://cdn.test/b.m3u8"]
+
+    # the stale rows are gone, no second check happens
+    assert cache.get("ep-2", "sub") is None
+    assert checked == ["https://cdn.test/b.m3u8"]
+    assert cache._db.execute("SELECT COUNT(*) FROM streams").fetchone()[0] == 0
+
+    # a signed url far in the future still expires with max_age
+    cache.put("ep-3", "HD-1", "sub", media(f"https://cdn.test/c.m3u8?expires={int(now) + 10**6}"))
+    monkeypatch.setattr(stream_cache.time, "time", lambda: now + 700 + 86401)
+    assert cache.get("ep-3", "sub") is None
+    cache.close()
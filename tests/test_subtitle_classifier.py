@@ -0,0 +1,64 @@
+import threading
+from types import SimpleNamespace
+
+from langdetect import DetectorFactory
+
+from tools.subtitle_classifier import SubtitleClassifier
+
+DetectorFactory.seed = 0
+
+ENGLISH = "WEBVTT\n\n00:01.000 --> 00:04.000\nWhere are you going? I told you to wait for me at the station.\n"
+FRENCH = (
+    "WEBVTT\n\n00:01.000 --> 00:04.000\nOù est-ce que tu vas ? Je t'avais dit de m'attendre devant la gare.\n\n"
+    "00:05.000 --> 00:08.000\nNous allons être en retard pour le train, dépêche-toi s'il te plaît.\n"
+)
+
+
+class StubSession:
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.calls: list[str] = []
+        self.release = threading.Event()
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append(url)
+        self.release.wait(5)
+        if url not in self.bodies:
+            raise OSError("connection reset")
+        return SimpleNamespace(content=self.bodies[url].encode("utf-8"))
+
+
+def test_each_url_is_classified_once():
+    session = StubSession({"https://cdn.test/eng.vtt": ENGLISH, "https://cdn.test/fre.vtt": FRENCH})
+    # langdetect seeds the global random module, parallel detections would not be reproducible
+    classifier = SubtitleClassifier(workers=1, session=session)
+    done = []
+
+    first = classifier.submit("https://cdn.test/eng.vtt", {}, done.append)
+    # a second lookup while the download is running shares the future
+    second = classifier.submit("https://cdn.test/eng.vtt", {}, done.append)
+    french = classifier.submit("https://cdn.test/fre.vtt", {})
+    missing = classifier.submit("https://cdn.test/missing.vtt", {})
+    assert first is second
+    session.release.set()
+
+    assert first.result(5) == "en"
+    assert french.result(5) == "fr"
+    # download errors resolve to None instead of raising
+    assert missing.result(5) is None
+    assert done == [first, first]
+    # a lookup after the result is known does not download again
+    assert classifier.submit("https://cdn.test/eng.vtt", {}).result(5) == "en"
+    assert sorted(session.calls) == ["https://cdn.test/eng.vtt", "https://cdn.test/fre.vtt", "https://cdn.test/missing.vtt"]
+    classifier.close()
+
+
+def test_close_cancels_queued_urls():
+    session = StubSession({})
+    classifier = SubtitleClassifier(workers=1, session=session)
+    running = classifier.submit("https://cdn.test/a.vtt", {})
+    queued = classifier.submit("https://cdn.test/b.vtt", {})
+    classifier.close()
+    session.release.set()
+    assert queued.cancelled()
+    assert running.result(5) is None
@@ -0,0 +1,52 @@
+from benchmarks.run import make_args
+from extractors.hianime import Anime
+from extractors.hianime_sync import HianimeSync
+
+SIZE = 2 * 1024 * 1024
+
+
+def make_sync(tmp_path):
+    sync = HianimeSync(make_args(str(tmp_path), cache_dir=None))
+    anime = Anime("Show", "https://hianime.test/show-1", 12, 0, "sub", 1)
+    return sync, anime, str(tmp_path) + "/"
+
+
+def record(sync, anime, folder, number, written=True):
+    """A json entry for episode `number` whose download finished (`written`) or failed."""
+    episode = {"number": number, "title": f"Episode {number}", "url": f"https://hianime.test/ep-{number}"}
+    if written:
+        with open(f"{folder}{sync.extractor.episode_filename(anime, episode)}.mp4", "wb") as f:
+            f.write(b"\0" * SIZE)
+        episode["filesize"] = SIZE
+    return episode
+
+
+def test_first_missing_retries_gaps(tmp_path):
+    sync, anime, folder = make_sync(tmp_path)
+
+    def first_missing(*numbers):
+        return sync.first_missing(folder, anime, {n: record(sync, anime, folder, n) for n in numbers})
+
+    assert sync.first_missing(folder, anime, {}) == 1
+    assert first_missing(1, 2, 3) == 4
+    # episode 5 failed in an earlier sync while 6 and 7 finished
+    assert first_missing(1, 2, 3, 4, 6, 7) == 5
+    # a series downloaded from episode 10 on does not go back to episode 1
+    assert first_missing(10, 11) == 12
+
+
+def test_first_missing_retries_failed_json_entries(tmp_path):
+    sync, anime, folder = make_sync(tmp_path)
+    # a single run wrote episode 2 to the json although its download failed
+    episodes = {
+        1: record(sync, anime, folder, 1),
+        2: record(sync, anime, folder, 2, written=False),
+        3: record(sync, anime, folder, 3),
+    }
+    assert sync.first_missing(folder, anime, episodes) == 2
+
+    # an interrupted download leaves a partial file behind
+    episodes[2] = record(sync, anime, folder, 2)
+    with open(f"{folder}s01e02 - Episode 2.mp4.part", "wb"):
+        pass
+    assert sync.first_missing(folder, anime, episodes) == 2
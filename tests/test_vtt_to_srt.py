@@ -0,0 +1,65 @@
+import os
+
+from tools.functions import convert_vtt_tree, iter_srt_cues, vtt_to_srt
+
+VTT = (
+    "\ufeffWEBVTT - English\r\n"
+    "Kind: captions\r\n"
+    "\r\n"
+    "NOTE written by hand\r\n"
+    "00:00:00.000 --> 00:00:01.000 is not a cue here\r\n"
+    "\r\n"
+    "STYLE\r\n"
+    "::cue { color: yellow }\r\n"
+    "\r\n"
+    "intro\r\n"
+    "00:01.500 --> 00:03.25 align:start position:10%\r\n"
+    "<v Narrator>Long ago,</v> <i>in a land</i>\r\n"
+    "Tom &amp; Jerry &lt;3\r\n"
+    "\r\n"
+    "\r\n"
+    "01:02:03.004 --> 01:02:05.000\r\n"
+    "<c.yellow>Last line</c>"
+)
+
+SRT = (
+    "1\n00:00:01,500 --> 00:00:03,250\nLong ago, in a land\nTom & Jerry <3\n\n"
+    "2\n01:02:03,004 --> 01:02:05,000\nLast line\n\n"
+)
+
+
+def test_cues_skip_header_note_and_style_blocks():
+    assert "".join(iter_srt_cues(VTT.splitlines(keepends=True))) == SRT
+
+
+def test_empty_cues_are_dropped():
+    lines = ["WEBVTT\n", "\n", "1\n", "00:01.000 --> 00:02.000\n", "\n", "00:03.000 --> 00:04.000\n", "text\n"]
+    assert list(iter_srt_cues(lines)) == ["1\n00:00:03,000 --> 00:00:04,000\ntext\n\n"]
+
+
+def test_vtt_to_srt_writes_next_to_the_input(tmp_path):
+    vtt_file = tmp_path / "episode.vtt"
+    vtt_file.write_bytes(VTT.encode("utf-8"))
+    srt_file = vtt_to_srt(str(vtt_file))
+    assert srt_file == str(tmp_path / "episode.srt")
+    with open(srt_file, encoding="utf-8", newline="") as f:
+        assert f.read() == SRT
+    # no temporary file is left behind
+    assert sorted(os.listdir(tmp_path)) == ["episode.srt", "episode.vtt"]
+
+
+def test_convert_vtt_tree(tmp_path):
+    season = tmp_path / "Show" / "Season 1"
+    season.mkdir(parents=True)
+    for name in ("e01.vtt", "e02.VTT"):
+        (season / name).write_text(VTT, encoding="utf-8")
+    (season / "e01.mp4").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("WEBVTT")
+
+    converted = convert_vtt_tree(str(tmp_path), workers=2)
+    assert sorted(os.path.basename(path) for path in converted) == ["e01.srt", "e02.srt"]
+    assert (season / "e02.srt").read_text(encoding="utf-8") == SRT
+
+    # up to date files are skipped unless forced
+    assert convert_vtt_tree(str(tmp_path), workers=2) == []
+    assert len(convert_vtt_tree(str(tmp_path), workers=2, force=True)) == 2
@@ -0,0 +1,39 @@
+from benchmarks.fake_site import FakeSite
+from benchmarks.run import make_args, make_extractor
+
+
+class RecordingController:
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+
+    def acquire(self, url):
+        self.calls.append(("acquire", url))
+
+    def success(self, url):
+        self.calls.append(("success", url))
+
+    def failure(self, url):
+        self.calls.append(("failure", url))
+
+
+def test_fragments_are_paced_on_their_own_urls(tmp_path):
+    with FakeSite(segments=3, segment_size=4096) as site:
+        extractor = make_extractor(site, make_args(str(tmp_path), downloader="yt-dlp"))
+        extractor.rate_controller = RecordingController()
+        variant = f"{site.url}/hls/1001/720/index.m3u8"
+        # segment urls on another host than the variant playlist, as a CDN would hand them out
+        cdn = site.url.replace("127.0.0.1", "localhost")
+        playlist = extractor.session.get(variant).text.replace("seg", f"{cdn}/hls/1001/720/seg")
+
+        assert extractor.yt_dlp_download(variant, {}, str(tmp_path / "episode.mp4"), "episode", playlist)
+
+    segment = f"{cdn}/hls/1001/720/seg{{}}.ts".format
+    assert extractor.rate_controller.calls == [
+        ("acquire", variant),
+        ("acquire", segment(0)),
+        ("success", segment(0)),
+        ("acquire", segment(1)),
+        ("success", segment(1)),
+        ("acquire", segment(2)),
+        ("success", segment(2)),
+    ]
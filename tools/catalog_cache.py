@@ -0,0 +1,108 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any
+
+
+def normalize_query(query: str) -> str:
+    """Lower case, punctuation dropped and whitespace collapsed, so equivalent searches share an entry."""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+class CatalogCache:
+    """
+    On-disk cache of parsed search result pages and series pages.
+
+    Maps (normalized query, page number) to the list of result records (name, url, sub and dub
+    episode counts). Entries expire after `ttl` seconds, since episode counts of airing series
+    change over time.
+
+    Series pages are stored with their ETag / Last-Modified validators instead, they are
+    always revalidated with a conditional request and reused on a 304. Pages not stored or
+    revalidated for `page_ttl` seconds are dropped. Expired rows are purged on open.
+    """
+
+    def __init__(self, path: str, ttl: int = 6 * 3600, page_ttl: int = 30 * 86400) -> None:
+        """
+        Args:
+            path: SQLite database file, parent directories are created
+            ttl: Seconds a cached results page stays valid
+            page_ttl: Seconds a series page is kept without being revalidated
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.ttl = ttl
+        self.page_ttl = page_ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS searches (
+                    query TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    results TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (query, page)
+                )
+                """
+            )
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    record TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+        self.purge()
+
+    def put(self, query: str, page: int, results: list[dict[str, Any]]) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?)",
+                (normalize_query(query), page, json.dumps(results), time.time()),
+            )
+
+    def get(self, query: str, page: int) -> list[dict[str, Any]] | None:
+        """The cached results of one page, None when missing or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT results, fetched_at FROM searches WHERE query = ? AND page = ?",
+                (normalize_query(query), page),
+            ).fetchone()
+        if not row or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put_page(self, url: str, etag: str | None, last_modified: str | None, record: dict[str, Any]) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(record), time.time()),
+            )
+
+    def get_page(self, url: str) -> dict[str, Any] | None:
+        """The validators and parsed record of a series page, None if it was never stored or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, record, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if not row or time.time() - row[3] > self.page_ttl:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "record": json.loads(row[2])}
+
+    def purge(self) -> None:
+        """Remove every expired entry."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM searches WHERE fetched_at < ?", (time.time() - self.ttl,))
+            self._db.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.page_ttl,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
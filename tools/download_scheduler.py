@@ -0,0 +1,136 @@
+import itertools
+import queue
+import threading
+from typing import Any, Callable, Hashable
+
+
+class DownloadScheduler:
+    """
+    Runs download jobs on a bounded number of worker threads.
+
+    Jobs wait in a priority queue. With order "fifo" they run in submission order,
+    with order "episode" the lowest priority value (the episode number) runs first.
+
+    The queue is bounded by `max_queued`: once that many jobs are waiting, `submit` blocks
+    until a worker frees up. This keeps producers (link capture) from running far ahead of
+    the downloads, so captured stream urls are used while their signed tokens are fresh.
+    A `max_queued` of None leaves the queue unbounded.
+
+    Jobs can be submitted with a `group` (e.g. one series of a batch run) so that `cancel`
+    can drop the jobs of one group and leave the others running.
+    """
+
+    ORDERS: tuple[str, ...] = ("fifo", "episode")
+
+    def __init__(self, max_workers: int = 4, order: str = "episode", max_queued: int | None = None) -> None:
+        if order not in self.ORDERS:
+            raise ValueError(f"Unknown download order '{order}', expected one of {self.ORDERS}")
+        self.max_workers = max(1, max_workers)
+        self.order = order
+        self.cancelled = threading.Event()
+        self._cancelled_groups: set[Hashable] = set()
+        self._slots: threading.Semaphore | None = (
+            threading.Semaphore(self.max_workers + max(0, max_queued)) if max_queued is not None else None
+        )
+
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._workers: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._unfinished = 0
+        self._active = 0
+
+    @property
+    def active(self) -> int:
+        """Number of jobs currently running."""
+        return self._active
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs waiting for a free worker."""
+        return self._queue.qsize()
+
+    def is_cancelled(self, group: Hashable | None = None) -> bool:
+        """Whether jobs of `group` should stop, because it or the whole scheduler was cancelled."""
+        return self.cancelled.is_set() or (group is not None and group in self._cancelled_groups)
+
+    def submit(self, func: Callable[..., Any], *args: Any, priority: int = 0, group: Hashable | None = None) -> bool:
+        """
+        Queue `func(*args)`, `priority` is only used when the order is "episode".
+
+        Blocks while the queue is full. Returns False if the scheduler or `group` was
+        cancelled before the job could be queued.
+        """
+        if self._slots is not None:
+            # poll so a cancel wakes up producers blocked on a full queue
+            while not self._slots.acquire(timeout=0.5):
+                if self.is_cancelled(group):
+                    return False
+        if self.is_cancelled(group):
+            self._release_slot()
+            return False
+        seq = next(self._counter)
+        with self._lock:
+            self._unfinished += 1
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+        key = priority if self.order == "episode" else seq
+        self._queue.put((key, seq, group, func, args))
+        return True
+
+    def _release_slot(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+    def _work(self) -> None:
+        while True:
+            _, _, group, func, args = self._queue.get()
+            with self._lock:
+                self._active += 1
+            try:
+                if not self.is_cancelled(group):
+                    func(*args)
+            except Exception as e:
+                print(f"\nDownload job failed: {e}")
+            finally:
+                self._release_slot()
+                with self._lock:
+                    self._active -= 1
+                    self._unfinished -= 1
+                    if self._unfinished == 0:
+                        self._idle.notify_all()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until every submitted job has finished, returns False if `timeout` expired first."""
+        with self._lock:
+            return self._idle.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def cancel(self, group: Hashable | None = None) -> None:
+        """
+        Drop queued jobs and signal running jobs to stop, see `is_cancelled`.
+
+        With a `group` only the jobs submitted with that group are affected.
+        """
+        if group is None:
+            self.cancelled.set()
+        else:
+            self._cancelled_groups.add(group)
+        kept = []
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if group is not None and job[2] != group:
+                kept.append(job)
+                continue
+            self._release_slot()
+            with self._lock:
+                self._unfinished -= 1
+                if self._unfinished == 0:
+                    self._idle.notify_all()
+        for job in kept:
+            self._queue.put(job)
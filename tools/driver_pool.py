@@ -0,0 +1,121 @@
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+
+class DriverPool:
+    """
+    Fixed-size pool of independent browser drivers.
+
+    Every driver is its own Chrome/selenium-wire instance, so each one keeps its own
+    proxy request buffer. Work handed to `map` is spread over the drivers with at most
+    one item per driver at a time.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int,
+        drivers: list[Any] | None = None,
+    ) -> None:
+        """
+        Args:
+            factory: Callable creating a new, ready to use driver
+            size: Number of drivers in the pool (minimum 1)
+            drivers: Already launched drivers to adopt into the pool
+        """
+        self.factory = factory
+        self.size = max(1, size)
+        self.drivers: list[Any] = list(drivers or [])[: self.size]
+        self._idle: queue.Queue = queue.Queue()
+        for driver in self.drivers:
+            self._idle.put(driver)
+
+    def start(self) -> None:
+        """Launch the missing drivers concurrently, drivers that fail to start are skipped."""
+        lock = threading.Lock()
+
+        def launch():
+            try:
+                driver = self.factory()
+            except Exception as e:
+                print(f"Failed to launch browser driver: {e}")
+                return
+            with lock:
+                self.drivers.append(driver)
+            self._idle.put(driver)
+
+        launchers = [
+            threading.Thread(target=launch, daemon=True)
+            for _ in range(self.size - len(self.drivers))
+        ]
+        for t in launchers:
+            t.start()
+        for t in launchers:
+            t.join()
+
+    def map(
+        self,
+        func: Callable[[Any, Any], Any],
+        items: list[Any],
+        stop: threading.Event | None = None,
+        join_timeout: float = 30,
+    ) -> list[Any]:
+        """
+        Call `func(driver, item)` for every item, running one worker per driver.
+
+        Returns the results in the same order as `items`, items that were not processed
+        (because `stop` was set or the call raised) have a result of None. On
+        KeyboardInterrupt `stop` is set and the workers get up to `join_timeout` seconds to
+        finish their current item before the interrupt is raised again.
+        """
+        stop = stop or threading.Event()
+        results: list[Any] = [None] * len(items)
+        pending: queue.Queue = queue.Queue()
+        for index, item in enumerate(items):
+            pending.put((index, item))
+
+        def worker():
+            driver = self._idle.get()
+            try:
+                while not stop.is_set():
+                    try:
+                        index, item = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        results[index] = func(driver, item)
+                    except Exception as e:
+                        print(f"\nError while processing {item}: {e}")
+            finally:
+                self._idle.put(driver)
+
+        workers = [
+            threading.Thread(target=worker, daemon=True)
+            for _ in range(min(len(self.drivers), len(items)))
+        ]
+        try:
+            for t in workers:
+                t.start()
+            # join with a timeout so KeyboardInterrupt still reaches the main thread
+            while any(t.is_alive() for t in workers):
+                for t in workers:
+                    t.join(0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            deadline = time.monotonic() + join_timeout
+            for t in workers:
+                if t.is_alive():
+                    t.join(max(0, deadline - time.monotonic()))
+            raise
+        return results
+
+    def close(self) -> None:
+        """Quit every driver in the pool."""
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.drivers.clear()
@@ -0,0 +1,118 @@
+import html
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+# opening <a> tags, quoted attribute values may contain '>'. Every alternative starts with a
+# different character and the lengths are bounded, so a stray "<a " or an unbalanced quote in
+# inline scripts fails in linear time instead of backtracking through every split of the tag.
+ANCHOR_RE = re.compile(r"""<a\s((?:[^>"']|"[^"]{0,2048}"|'[^']{0,2048}'){0,4096})>""", re.IGNORECASE)
+ATTR_RE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+
+def _join(base_url: str, href: str) -> str:
+    # episode links are root relative, skip the general (and slow) urljoin for them
+    if href.startswith("/") and not href.startswith("//"):
+        return base_url.rstrip("/") + href
+    return urljoin(base_url, href)
+
+
+def parse_episode_links(page: str, base_url: str, start_episode: int = 1, end_episode: int | None = None) -> list[dict[str, Any]]:
+    """
+    Episodes from the `a[data-number]` anchors of a series page or episode list fragment.
+
+    Scans the markup for anchor tags with a regular expression instead of building a full
+    document tree, which is many times faster on a rendered page. Falls back to
+    BeautifulSoup if the scan finds nothing although the page has episode anchors.
+    """
+    anchors: list[dict[str, str]] = []
+    for match in ANCHOR_RE.finditer(page):
+        tag = match.group(1)
+        if "data-number" in tag:
+            anchors.append({name.lower(): a or b or c for name, a, b, c in ATTR_RE.findall(tag)})
+
+    if not anchors and "data-number" in page:
+        soup = BeautifulSoup(page, "html.parser")
+        anchors = [
+            {key: str(value) for key, value in link.attrs.items()}  # type: ignore
+            for link in soup.find_all("a", attrs={"data-number": True})
+        ]
+
+    episodes: list[dict[str, Any]] = []
+    for attrs in anchors:
+        number = attrs.get("data-number", "").strip()
+        if not number.isdigit() or "href" not in attrs:
+            continue
+        if int(number) < start_episode or (end_episode is not None and int(number) > end_episode):
+            continue
+        title = attrs.get("title")
+        episodes.append(
+            {
+                "url": _join(base_url, html.unescape(attrs["href"])),
+                "number": int(number),
+                "title": html.unescape(title) if title and "&" in title else title,
+            }
+        )
+    return episodes
+
+
+class EpisodeIndex:
+    """
+    On-disk index of every known episode of a series, keyed by the series url.
+
+    An entry is refreshed when a run asks for episodes past the last indexed one, and after
+    `ttl` seconds so re-uploaded episodes with new urls are picked up.
+    """
+
+    def __init__(self, path: str, ttl: int = 24 * 3600) -> None:
+        """
+        Args:
+            path: SQLite database file, parent directories are created
+            ttl: Seconds an indexed episode list stays valid
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS episodes (
+                    anime_url TEXT PRIMARY KEY,
+                    episodes TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def put(self, anime_url: str, episodes: list[dict[str, Any]]) -> None:
+        entries = [{key: episode[key] for key in ("url", "number", "title")} for episode in episodes]
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO episodes VALUES (?, ?, ?)",
+                (anime_url, json.dumps(entries), time.time()),
+            )
+
+    def get(self, anime_url: str, start_episode: int, end_episode: int) -> list[dict[str, Any]] | None:
+        """Episodes `start_episode` - `end_episode`, None unless a fresh entry covers the whole range."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT episodes, updated_at FROM episodes WHERE anime_url = ?", (anime_url,)
+            ).fetchone()
+        if not row or time.time() - row[1] > self.ttl:
+            return None
+        episodes = json.loads(row[0])
+        if not episodes or max(episode["number"] for episode in episodes) < end_episode:
+            return None
+        return [episode for episode in episodes if start_episode <= episode["number"] <= end_episode]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
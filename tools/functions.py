@@ -1,11 +1,84 @@
+import html
 import os
+import re
+import shutil
+import subprocess
 import time
-import webvtt
+from typing import Iterable, Iterator
+
+
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _srt_timestamp(timestamp: str) -> str:
+    """Convert a VTT timestamp (hh:mm:ss.ttt or mm:ss.ttt) to SRT's hh:mm:ss,ttt."""
+    clock, _, millis = timestamp.strip().partition(".")
+    parts = clock.split(":")
+    if len(parts) == 2:
+        parts.insert(0, "00")
+    hours, minutes, seconds = parts
+    return f"{int(hours):02}:{int(minutes):02}:{int(seconds):02},{millis.ljust(3, '0')[:3]}"
+
+
+def iter_srt_cues(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Translate VTT lines into SRT cue blocks one cue at a time.
+
+    Only the current cue is held in memory. Header, NOTE, STYLE and REGION blocks are
+    skipped, cue settings are dropped and markup tags are removed from the text.
+    """
+    index = 0
+    timing: str | None = None
+    text: list[str] = []
+    skipping = False
+
+    def block() -> str:
+        return f"{index}\n{timing}\n" + "\n".join(text) + "\n\n"
+
+    for raw in lines:
+        line = raw.rstrip("\r\n").lstrip("\ufeff")
+        if not line.strip():
+            if timing is not None and text:
+                index += 1
+                yield block()
+            timing, text, skipping = None, [], False
+            continue
+        if skipping:
+            continue
+        if timing is None:
+            if "-->" in line:
+                start, _, end = line.partition("-->")
+                timing = f"{_srt_timestamp(start)} --> {_srt_timestamp(end.split()[0])}"
+            elif line.startswith(("WEBVTT", "NOTE", "STYLE", "REGION")):
+                skipping = True
+            # anything else before the timing line is a cue identifier
+            continue
+        text.append(html.unescape(TAG_RE.sub("", line)))
+
+    if timing is not None and text:
+        index += 1
+        yield block()
+
+
+def write_atomic(path: str, chunks: Iterable[str], encoding: str = "utf-8") -> None:
+    """Write `chunks` to a temporary file next to `path` and rename it into place."""
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp, "w", encoding=encoding) as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
 
 
 def vtt_to_srt(vtt_file: str, srt_file: str | None = None) -> str:
     """
     Convert a VTT subtitle file to SRT format.
+
+    The file is streamed cue by cue, so memory use does not depend on the file size.
     
     Args:
         vtt_file: Path to the input VTT file
@@ -16,34 +89,49 @@ def vtt_to_srt(vtt_file: str, srt_file: str | None = None) -> str:
     """
     if srt_file is None:
         srt_file = os.path.splitext(vtt_file)[0] + ".srt"
-    
-    # Read VTT file
-    vtt = webvtt.read(vtt_file)
-    
-    # Convert to SRT format
-    srt_lines = []
-    for i, caption in enumerate(vtt, start=1):
-        # Add sequence number
-        srt_lines.append(str(i))
-        
-        # Convert timestamp format from 00:00:00.000 to 00:00:00,000
-        start_time = caption.start.replace(".", ",")
-        end_time = caption.end.replace(".", ",")
-        srt_lines.append(f"{start_time} --> {end_time}")
-        
-        # Add caption text (webvtt already handles cleaning tags)
-        srt_lines.append(caption.text)
-        
-        # Add blank line between captions
-        srt_lines.append("")
-    
-    # Write SRT file
-    with open(srt_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(srt_lines))
-    
+
+    with open(vtt_file, "r", encoding="utf-8", errors="replace") as vtt:
+        write_atomic(srt_file, iter_srt_cues(vtt))
+
     return srt_file
 
 
+def convert_vtt_tree(root: str, workers: int | None = None, force: bool = False) -> list[str]:
+    """
+    Convert every .vtt file under `root` to .srt using a process pool.
+
+    Files whose .srt is already newer than the .vtt are skipped unless `force` is set.
+
+    Returns:
+        Paths of the SRT files that were written
+    """
+    jobs: list[str] = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if not name.lower().endswith(".vtt"):
+                continue
+            vtt_file = os.path.join(directory, name)
+            srt_file = os.path.splitext(vtt_file)[0] + ".srt"
+            if not force and os.path.exists(srt_file) and os.path.getmtime(srt_file) >= os.path.getmtime(vtt_file):
+                continue
+            jobs.append(vtt_file)
+
+    converted: list[str] = []
+    if not jobs:
+        return converted
+    # multiprocessing is only loaded by runs that convert a whole tree
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(vtt_to_srt, vtt_file): vtt_file for vtt_file in jobs}
+        for future in as_completed(futures):
+            try:
+                converted.append(future.result())
+            except Exception as e:
+                print(f"Error converting {futures[future]}: {e}")
+    return converted
+
+
 def get_confirmation(prompt: str) -> bool:
     ans: str = input(prompt).lower()
     if ans == "y" or ans == "yes" or ans == "true":
@@ -86,3 +174,63 @@ def safe_remove(file: str, retries: int = 5, delay: int = 2):
             print("Retrying deletion of files")
             time.sleep(delay)
     print("failed to remove file")
+
+
+def probe_duration(file: str) -> float | None:
+    """Duration of a media file in seconds using ffprobe, None if ffprobe is missing or fails."""
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    try:
+        output = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", file],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        ).stdout.strip()
+        return float(output)
+    except (subprocess.SubprocessError, ValueError, OSError):
+        return None
+
+
+def remux_to_mp4(source: str, target: str) -> bool:
+    """
+    Copy the streams of `source` (e.g. MPEG-TS) into an MP4 container at `target` with ffmpeg.
+
+    Nothing is re-encoded. Returns False if ffmpeg is missing or fails, `target` is left untouched then.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return False
+    temp = target + ".remux"
+    try:
+        subprocess.run(
+            # ADTS AAC in MPEG-TS has to become raw AAC in MP4, like yt-dlp's HLS fixup
+            [
+                ffmpeg, "-v", "error", "-y", "-i", source,
+                "-map", "0", "-c", "copy", "-bsf:a", "aac_adtstoasc", "-f", "mp4", temp,
+            ],
+            capture_output=True,
+            check=True,
+            timeout=600,
+        )
+        os.replace(temp, target)
+        return True
+    except (subprocess.SubprocessError, OSError):
+        if os.path.exists(temp):
+            os.remove(temp)
+        return False
+
+
+def playlist_duration(playlist: str) -> float | None:
+    """Total duration of a media playlist by summing its #EXTINF segment lengths."""
+    total = 0.0
+    found = False
+    for line in playlist.splitlines():
+        if line.startswith("#EXTINF:"):
+            try:
+                total += float(line[len("#EXTINF:"):].split(",")[0])
+                found = True
+            except ValueError:
+                continue
+    return total if found else None
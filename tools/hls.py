@@ -0,0 +1,163 @@
+import re
+from dataclasses import dataclass, field
+from urllib.parse import urljoin
+
+ATTRIBUTE_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+@dataclass
+class Variant:
+    url: str
+    bandwidth: int = 0
+    width: int | None = None
+    height: int | None = None
+    codecs: str = ""
+
+
+@dataclass
+class MasterPlaylist:
+    url: str
+    variants: list[Variant] = field(default_factory=list)
+    # True when the url was a media playlist rather than a master
+    is_media: bool = False
+
+
+@dataclass
+class Key:
+    method: str
+    url: str | None = None
+    # explicit IV from the playlist, otherwise the segment's media sequence number is used
+    iv: bytes | None = None
+
+
+@dataclass
+class Segment:
+    url: str
+    duration: float
+    sequence: int
+    key: Key | None = None
+    # (length, offset) for #EXT-X-BYTERANGE segments
+    byte_range: tuple[int, int] | None = None
+
+
+@dataclass
+class MediaPlaylist:
+    url: str
+    segments: list[Segment] = field(default_factory=list)
+    # #EXT-X-MAP initialization section for fragmented mp4 streams
+    init_url: str | None = None
+
+    @property
+    def duration(self) -> float:
+        return sum(segment.duration for segment in self.segments)
+
+
+def parse_attributes(line: str) -> dict[str, str]:
+    """Parse the attribute list of an HLS tag, e.g. BANDWIDTH=1280000,CODECS="avc1,mp4a"."""
+    _, _, attributes = line.partition(":")
+    return {key: value.strip('"') for key, value in ATTRIBUTE_RE.findall(attributes)}
+
+
+def parse_master(text: str, base_url: str) -> MasterPlaylist:
+    master = MasterPlaylist(base_url)
+    lines = [line.strip() for line in text.splitlines()]
+
+    stream_inf: dict[str, str] | None = None
+    for line in lines:
+        if not line:
+            continue
+        if line.startswith("#EXTINF:"):
+            master.is_media = True
+        elif line.startswith("#EXT-X-STREAM-INF:"):
+            stream_inf = parse_attributes(line)
+        elif not line.startswith("#") and stream_inf is not None:
+            width, _, height = stream_inf.get("RESOLUTION", "").partition("x")
+            master.variants.append(
+                Variant(
+                    urljoin(base_url, line),
+                    int(stream_inf.get("BANDWIDTH", "0") or 0),
+                    int(width) if width.isdigit() else None,
+                    int(height) if height.isdigit() else None,
+                    stream_inf.get("CODECS", ""),
+                )
+            )
+            stream_inf = None
+
+    if not master.variants and not master.is_media:
+        # playlists without STREAM-INF attributes, take the first non-iframe playlist like before
+        for line in lines:
+            if line.endswith(".m3u8") and "iframe" not in line and not line.startswith("#"):
+                master.variants.append(Variant(urljoin(base_url, line)))
+                break
+    return master
+
+
+def select_variant(
+    variants: list[Variant], max_height: int | None = None, max_bandwidth: int | None = None
+) -> Variant | None:
+    """
+    Pick the highest quality variant within the resolution and bitrate caps.
+
+    If no variant fits the caps the smallest one is returned instead of nothing.
+    """
+    if not variants:
+        return None
+
+    def quality(variant: Variant) -> tuple[int, int]:
+        return (variant.height or 0, variant.bandwidth)
+
+    allowed = [
+        variant
+        for variant in variants
+        if (not max_height or not variant.height or variant.height <= max_height)
+        and (not max_bandwidth or not variant.bandwidth or variant.bandwidth <= max_bandwidth)
+    ]
+    if not allowed:
+        return min(variants, key=quality)
+    return max(allowed, key=quality)
+
+
+def parse_media(text: str, base_url: str) -> MediaPlaylist:
+    playlist = MediaPlaylist(base_url)
+    sequence = 0
+    duration = 0.0
+    key: Key | None = None
+    byte_range: tuple[int, int] | None = None
+    next_offset = 0
+
+    for line in (line.strip() for line in text.splitlines()):
+        if not line:
+            continue
+        if line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            sequence = int(line.partition(":")[2])
+        elif line.startswith("#EXT-X-KEY:"):
+            attributes = parse_attributes(line)
+            method = attributes.get("METHOD", "NONE")
+            if method == "NONE":
+                key = None
+            else:
+                iv = attributes.get("IV")
+                key = Key(
+                    method,
+                    urljoin(base_url, attributes["URI"]) if attributes.get("URI") else None,
+                    bytes.fromhex(iv[2:] if iv.lower().startswith("0x") else iv) if iv else None,
+                )
+        elif line.startswith("#EXT-X-MAP:"):
+            uri = parse_attributes(line).get("URI")
+            if uri:
+                playlist.init_url = urljoin(base_url, uri)
+        elif line.startswith("#EXTINF:"):
+            try:
+                duration = float(line[len("#EXTINF:"):].split(",")[0])
+            except ValueError:
+                duration = 0.0
+        elif line.startswith("#EXT-X-BYTERANGE:"):
+            length, _, offset = line.partition(":")[2].partition("@")
+            byte_range = (int(length), int(offset) if offset else next_offset)
+            next_offset = byte_range[0] + byte_range[1]
+        elif not line.startswith("#"):
+            playlist.segments.append(Segment(urljoin(base_url, line), duration, sequence, key, byte_range))
+            sequence += 1
+            duration = 0.0
+            byte_range = None
+    return playlist
@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+import requests
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from requests.adapters import HTTPAdapter
+
+from tools.functions import remux_to_mp4
+from tools.hls import MediaPlaylist, Segment, parse_media
+from tools.rate_controller import HostRateController
+
+
+class DownloadStopped(Exception):
+    """Raised inside segment fetches once the download they belong to was cancelled."""
+
+
+class HlsDownloader:
+    """
+    Downloads an HLS media playlist by fetching segments concurrently.
+
+    Segments are requested over one keep-alive `requests.Session` and written to the output
+    file in playlist order as soon as the next one is available, so no fragment ever touches
+    the disk on its own. AES-128 keys are fetched once per key url. Progress is reported with
+    the same dicts yt-dlp passes to its progress hooks. With a rate controller every request
+    waits for a token of its host.
+
+    MPEG-TS segments are remuxed into an MP4 container with ffmpeg (`-c copy`) when the output
+    is an .mp4 file. Without ffmpeg the MPEG-TS stream is kept as is, like yt-dlp does.
+
+    An interrupted or failed download keeps its `.part` file, with the number of segments and
+    bytes written in order next to it in `.part.json`, and the next download of the same
+    playlist continues from there.
+    """
+
+    # first byte of every MPEG-TS packet
+    TS_SYNC_BYTE = 0x47
+
+    def __init__(
+        self,
+        workers: int = 8,
+        retries: int = 10,
+        timeout: int = 60,
+        session: requests.Session | None = None,
+        rate_controller: HostRateController | None = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.rate_controller = rate_controller
+        self.retries = retries
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers * 4)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self._keys: dict[str, bytes] = {}
+        self._keys_lock = threading.Lock()
+        self._warned_ffmpeg = False
+
+    def _get(
+        self,
+        url: str,
+        headers: dict[str, str],
+        byte_range: tuple[int, int] | None = None,
+        stop: threading.Event | None = None,
+    ) -> bytes:
+        if byte_range:
+            length, offset = byte_range
+            headers = {**headers, "Range": f"bytes={offset}-{offset + length - 1}"}
+        attempt = 0
+        while True:
+            if stop and stop.is_set():
+                raise DownloadStopped(url)
+            if self.rate_controller:
+                self.rate_controller.acquire(url)
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if self.rate_controller:
+                    self.rate_controller.report(url, response.status_code)
+                response.raise_for_status()
+                return response.content
+            except requests.RequestException as e:
+                if self.rate_controller and e.response is None:
+                    self.rate_controller.failure(url)
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                # the rate controller already slows the whole host down, this only spaces out
+                # the retries of one segment, which the in-order writer may be waiting on
+                delay = min(0.25 * 2**attempt, 10)
+                if stop:
+                    stop.wait(delay)
+                else:
+                    time.sleep(delay)
+
+    def _get_key(self, url: str, headers: dict[str, str], stop: threading.Event | None = None) -> bytes:
+        with self._keys_lock:
+            key = self._keys.get(url)
+        if key is None:
+            key = self._get(url, headers, stop=stop)
+            with self._keys_lock:
+                self._keys[url] = key
+        return key
+
+    def _fetch_segment(self, segment: Segment, headers: dict[str, str], stop: threading.Event | None = None) -> bytes:
+        data = self._get(segment.url, headers, segment.byte_range, stop)
+        if not segment.key:
+            return data
+        if segment.key.method != "AES-128" or not segment.key.url:
+            raise ValueError(f"Unsupported HLS encryption {segment.key.method}")
+
+        key = self._get_key(segment.key.url, headers, stop)
+        iv = segment.key.iv or segment.sequence.to_bytes(16, "big")
+        decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+        data = decryptor.update(data) + decryptor.finalize()
+        # strip the PKCS7 padding
+        padding = data[-1] if data else 0
+        return data[:-padding] if 0 < padding <= 16 else data
+
+    def _finish(self, part: str, location: str, remux: bool) -> None:
+        """Move the finished part file to `location`, remuxing MPEG-TS into MP4 when needed."""
+        if remux and location.lower().endswith(".mp4"):
+            with open(part, "rb") as f:
+                is_ts = f.read(1) == bytes([self.TS_SYNC_BYTE])
+            if is_ts:
+                if remux_to_mp4(part, location):
+                    os.remove(part)
+                    return
+                if not self._warned_ffmpeg:
+                    self._warned_ffmpeg = True
+                    print("ffmpeg not found or failed, keeping MPEG-TS data in the .mp4 files")
+        os.replace(part, location)
+
+    @staticmethod
+    def _load_resume(part: str, media: MediaPlaylist) -> tuple[int, int]:
+        """(segments, bytes) already written in order to `part` for this playlist, (0, 0) to start over."""
+        try:
+            with open(part + ".json", "r") as f:
+                state = json.load(f)
+            segments, offset = int(state["segments"]), int(state["offset"])
+            matches = state["count"] == len(media.segments) and state["duration"] == round(media.duration, 3)
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, 0
+        if not matches or not 0 < segments <= len(media.segments) or os.path.getsize(part) < offset:
+            return 0, 0
+        return segments, offset
+
+    @staticmethod
+    def _save_resume(part: str, media: MediaPlaylist, segments: int, offset: int) -> None:
+        if not segments or not os.path.exists(part):
+            return
+        state = {"segments": segments, "offset": offset, "count": len(media.segments), "duration": round(media.duration, 3)}
+        with open(part + ".json", "w") as f:
+            json.dump(state, f)
+
+    def download(
+        self,
+        url: str,
+        location: str,
+        headers: dict[str, str],
+        progress_hooks: list[Callable[[dict[str, Any]], None]] | None = None,
+        playlist: str | None = None,
+    ) -> bool:
+        """
+        Download the media playlist at `url` into `location`, resuming an interrupted download.
+
+        `playlist` can hold the already fetched playlist text. Returns False if a progress
+        hook cancelled the download with KeyboardInterrupt, other errors are raised. Hooks are
+        also called while waiting on a slow segment, so a cancel is noticed within a second.
+        """
+        if playlist is None:
+            playlist = self._get(url, headers).decode("utf-8")
+        media: MediaPlaylist = parse_media(playlist, url)
+        if not media.segments:
+            raise ValueError(f"No segments found in {url}")
+
+        hooks = progress_hooks or []
+        part = location + ".part"
+        total = len(media.segments)
+        # only keep a bounded number of finished segments in memory while waiting on a slow one
+        window = self.workers * 2
+        started = time.monotonic()
+        written, offset = self._load_resume(part, media)
+        resumed = offset
+        stop = threading.Event()
+
+        def report(index: int) -> None:
+            elapsed = time.monotonic() - started
+            speed = (offset - resumed) / elapsed if elapsed > 0 else None
+            estimate = int(offset / index * total) if index else None
+            progress = {
+                "status": "downloading",
+                "filename": location,
+                "downloaded_bytes": offset,
+                "total_bytes_estimate": estimate,
+                "elapsed": elapsed,
+                "speed": speed,
+                "eta": int((estimate - offset) / speed) if speed and estimate else None,
+                "fragment_index": index,
+                "fragment_count": total,
+            }
+            for hook in hooks:
+                hook(progress)
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hls-segment")
+        futures: dict[int, Future] = {}
+        try:
+            with open(part, "r+b" if written else "wb") as out:
+                if written:
+                    out.truncate(offset)
+                    out.seek(offset)
+                elif media.init_url:
+                    data = self._get(media.init_url, headers, stop=stop)
+                    out.write(data)
+                    offset += len(data)
+
+                next_submit = written
+                for index in range(written, total):
+                    while next_submit < total and next_submit < index + window:
+                        futures[next_submit] = pool.submit(
+                            self._fetch_segment, media.segments[next_submit], headers, stop
+                        )
+                        next_submit += 1
+
+                    future = futures.pop(index)
+                    while True:
+                        try:
+                            data = future.result(timeout=0.5)
+                            break
+                        except FutureTimeoutError:
+                            # lets a hook raise KeyboardInterrupt while a slow segment is pending
+                            report(index)
+                    out.write(data)
+                    offset += len(data)
+                    written = index + 1
+                    report(written)
+        except BaseException as e:
+            # running fetches stop at their next attempt, nothing waits for their retries
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._save_resume(part, media, written, offset)
+            if isinstance(e, KeyboardInterrupt):
+                return False
+            raise
+        pool.shutdown(wait=True)
+
+        if os.path.exists(part + ".json"):
+            os.remove(part + ".json")
+        self._finish(part, location, remux=not media.init_url)
+        finished = {
+            "status": "finished",
+            "filename": location,
+            "downloaded_bytes": offset,
+            "total_bytes": offset,
+            "elapsed": time.monotonic() - started,
+            "fragment_index": total,
+            "fragment_count": total,
+        }
+        for hook in hooks:
+            hook(finished)
+        return True
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from tools.catalog_cache import normalize_query
+from tools.rate_controller import HostRateController
+from tools.session import TimedSession
+
+JIKAN_ANIME_URL = "https://api.jikan.moe/v4/anime"
+
+
+class JikanClient:
+    """
+    Release year lookups on the Jikan (MyAnimeList) API.
+
+    Years are cached on disk by normalized title, titles Jikan does not know are remembered
+    for a shorter time. Requests go through a rate controller capped at `rate` requests per
+    second that backs off on 429s, Jikan allows about 60 requests per minute.
+    """
+
+    def __init__(
+        self,
+        cache_path: str | None = None,
+        session: requests.Session | None = None,
+        rate: float = 1.0,
+        ttl: int = 30 * 86400,
+        missing_ttl: int = 86400,
+        retries: int = 3,
+    ) -> None:
+        """
+        Args:
+            cache_path: SQLite database file, None disables the cache
+            session: Session used for the API requests, it must not retry on its own so the
+                rate controller sees every throttled response
+            rate: Maximum requests per second to Jikan
+            ttl: Seconds a found year stays cached
+            missing_ttl: Seconds a title without a result stays cached
+            retries: Attempts per title when Jikan throttles or fails
+        """
+        # not the shared session, its urllib3 retries would resend throttled requests right away
+        self.session = session or TimedSession(retries=0)
+        self.rate_controller = HostRateController(initial_rate=rate, min_rate=rate / 8, max_rate=rate)
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if cache_path:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+            self._db = sqlite3.connect(cache_path, check_same_thread=False)
+            with self._lock, self._db:
+                self._db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS years (
+                        title TEXT PRIMARY KEY,
+                        year TEXT,
+                        fetched_at REAL NOT NULL
+                    )
+                    """
+                )
+
+    def get_year(self, title: str) -> str | None:
+        """The year the title first aired, None if unknown or Jikan could not be reached."""
+        key = normalize_query(title)
+        found, year = self._cached(key)
+        if found:
+            return year
+
+        found, year = self._fetch(title)
+        if found and self._db:
+            with self._lock, self._db:
+                self._db.execute("INSERT OR REPLACE INTO years VALUES (?, ?, ?)", (key, year, time.time()))
+        return year
+
+    def prefetch(self, titles: list[str], workers: int = 3) -> dict[str, str | None]:
+        """Look up many titles concurrently, the rate limit still applies across all of them."""
+        unique = list(dict.fromkeys(titles))
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="jikan") as executor:
+            return dict(zip(unique, executor.map(self.get_year, unique)))
+
+    def _cached(self, key: str) -> tuple[bool, str | None]:
+        if not self._db:
+            return False, None
+        with self._lock:
+            row = self._db.execute("SELECT year, fetched_at FROM years WHERE title = ?", (key,)).fetchone()
+        if not row:
+            return False, None
+        year, fetched_at = row
+        ttl = self.ttl if year else self.missing_ttl
+        return time.time() - fetched_at < ttl, year
+
+    def _fetch(self, title: str) -> tuple[bool, str | None]:
+        """Returns (answered, year), answered is False when Jikan could not be asked."""
+        for _ in range(self.retries):
+            self.rate_controller.acquire(JIKAN_ANIME_URL)
+            try:
+                response = self.session.get(JIKAN_ANIME_URL, params={"q": title, "limit": 1})
+            except requests.RequestException:
+                self.rate_controller.failure(JIKAN_ANIME_URL)
+                continue
+            self.rate_controller.report(JIKAN_ANIME_URL, response.status_code)
+            if response.status_code in HostRateController.THROTTLE_STATUSES:
+                continue
+            if response.status_code != 200:
+                break
+
+            results = response.json().get("data", [])
+            if not results:
+                print(f"Anime not found on Jikan: {title}")
+                return True, None
+            aired_from = results[0].get("aired", {}).get("from")
+            if not aired_from:
+                print(f"No air date found for {title}")
+                return True, None
+            return True, aired_from[:4]
+
+        print("Error contacting Jikan API.")
+        return False, None
+
+    def close(self) -> None:
+        if self._db:
+            with self._lock:
+                self._db.close()
@@ -0,0 +1,177 @@
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from tools.functions import write_atomic
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore
+
+try:
+    import psutil
+except ImportError:  # only needed to measure the browsers
+    psutil = None  # type: ignore
+
+
+def peak_rss() -> dict[str, int] | None:
+    """
+    Peak resident memory in bytes of this process (including the selenium-wire proxy) and of
+    the largest child process that has exited and been reaped, e.g. a chromedriver that quit.
+    Chrome itself runs under chromedriver, see `process_tree_rss`. None where unsupported.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "exited_children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    }
+
+
+def process_tree_rss(pid: int) -> int | None:
+    """Current resident memory in bytes of a live process and all its descendants, None without psutil."""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(pid)
+        processes = [root, *root.children(recursive=True)]
+    except psutil.Error:
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            # exited in the meantime
+            pass
+    return total
+
+
+def _sample(value: float) -> str:
+    """A sample value without losing precision, integers stay integers (no 1.23457e+09)."""
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+class Metrics:
+    """
+    Lightweight per-stage timings and counters for one run.
+
+    Stages collect durations in seconds (driver launch, page loads, downloads...), counters
+    collect totals (capture attempts, downloaded bytes...), peaks keep the largest sample of a
+    gauge (browser memory...). At the end of a run the numbers
+    can be written as a JSON report or a Prometheus textfile.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.stages: dict[str, list[float]] = {}
+        self.counters: dict[str, float] = {}
+        self.peaks: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages.setdefault(stage, []).append(seconds)
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def peak(self, name: str, value: float) -> None:
+        with self._lock:
+            self.peaks[name] = max(self.peaks.get(name, value), value)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Time the body of a with block as one sample of `stage`, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def report(self, http_hosts: dict[str, dict[str, float]] | None = None) -> dict[str, Any]:
+        """The run summary, `http_hosts` are the per-host request totals of the session."""
+        with self._lock:
+            stages = {stage: sorted(samples) for stage, samples in self.stages.items()}
+            counters = dict(self.counters)
+            peaks = dict(self.peaks)
+
+        report: dict[str, Any] = {
+            "started": self.started,
+            "elapsed": time.time() - self.started,
+            "stages": {
+                stage: {
+                    "count": len(samples),
+                    "total": sum(samples),
+                    "mean": sum(samples) / len(samples),
+                    "min": samples[0],
+                    "p50": samples[len(samples) // 2],
+                    "max": samples[-1],
+                }
+                for stage, samples in stages.items()
+                if samples
+            },
+            "counters": counters,
+            "peaks": peaks,
+            "peak_rss": peak_rss(),
+        }
+        if http_hosts:
+            report["http"] = http_hosts
+        return report
+
+    def write_json(self, path: str, http_hosts: dict[str, dict[str, float]] | None = None) -> None:
+        write_atomic(path, [json.dumps(self.report(http_hosts), indent=4)])
+
+    def write_prometheus(self, path: str, http_hosts: dict[str, dict[str, float]] | None = None) -> None:
+        """Write the report in the Prometheus textfile collector format."""
+        report = self.report(http_hosts)
+        lines = [
+            "# TYPE hianime_run_seconds gauge",
+            f"hianime_run_seconds {report['elapsed']:.3f}",
+            "# TYPE hianime_stage_seconds summary",
+        ]
+        for stage, summary in report["stages"].items():
+            lines.append(f'hianime_stage_seconds_sum{{stage="{stage}"}} {summary["total"]:.3f}')
+            lines.append(f'hianime_stage_seconds_count{{stage="{stage}"}} {summary["count"]}')
+        if report["peak_rss"]:
+            lines.append("# TYPE hianime_peak_rss_bytes gauge")
+            for process, size in report["peak_rss"].items():
+                lines.append(f'hianime_peak_rss_bytes{{process="{process}"}} {size}')
+        for name, value in report["peaks"].items():
+            metric = "hianime_peak_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {_sample(value)}")
+        for name, value in report["counters"].items():
+            metric = "hianime_" + re.sub(r"[^a-zA-Z0-9_]", "_", name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {_sample(value)}")
+        for field in ("requests", "errors", "seconds", "bytes"):
+            if "http" not in report:
+                break
+            lines.append(f"# TYPE hianime_http_{field}_total counter")
+            for host, summary in report["http"].items():
+                lines.append(f'hianime_http_{field}_total{{host="{host}"}} {_sample(summary[field])}')
+        write_atomic(path, ["\n".join(lines) + "\n"])
+
+
+_metrics: Metrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """The process-wide metrics collector."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from typing import Any, Callable
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TiB"
+
+
+def format_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return "--"
+    return f"{int(seconds // 60)}m {int(seconds % 60)}s"
+
+
+class ProgressAggregator:
+    """
+    Aggregates the per-episode progress dicts reported by the download hooks.
+
+    Tracks downloaded and total bytes, speed and fragment counts for every running episode,
+    finished episodes are moved out of the active set. The global ETA is the remaining bytes
+    of running episodes (plus queued ones, estimated from the average finished size) divided
+    by the combined speed. With `jsonl_path` every update, at most one per `interval`
+    seconds, is appended to that file as a JSON line.
+    """
+
+    def __init__(
+        self,
+        jsonl_path: str | None = None,
+        interval: float = 1.0,
+        queued: Callable[[], int] | None = None,
+    ) -> None:
+        """
+        Args:
+            jsonl_path: File to append JSON-lines progress snapshots to
+            interval: Minimum seconds between two JSON lines
+            queued: Returns the number of episodes still waiting to start
+        """
+        self.jsonl_path = jsonl_path
+        self.interval = interval
+        self.queued = queued or (lambda: 0)
+        self.active: dict[str, dict[str, Any]] = {}
+        self.finished: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._last_write = 0.0
+
+    def update(self, episode: str, d: dict[str, Any]) -> None:
+        """Progress hook entry point, `d` uses the yt-dlp progress dict format."""
+        with self._lock:
+            if d["status"] == "downloading":
+                self.active[episode] = {
+                    "downloaded_bytes": d.get("downloaded_bytes") or 0,
+                    "total_bytes": d.get("total_bytes") or d.get("total_bytes_estimate") or 0,
+                    "speed": d.get("speed") or 0.0,
+                    "fragment_index": d.get("fragment_index"),
+                    "fragment_count": d.get("fragment_count"),
+                }
+            elif d["status"] == "finished":
+                entry = self.active.pop(episode, {})
+                self.finished[episode] = d.get("total_bytes") or d.get("downloaded_bytes") or entry.get("downloaded_bytes", 0)
+            elif d["status"] == "error":
+                self.active.pop(episode, None)
+            write = self.jsonl_path and time.monotonic() - self._last_write >= self.interval
+            if write:
+                self._last_write = time.monotonic()
+        if write or (self.jsonl_path and d["status"] == "finished"):
+            self.write_jsonl()
+
+    def snapshot(self) -> dict[str, Any]:
+        queued = self.queued()
+        with self._lock:
+            active = {episode: dict(progress) for episode, progress in self.active.items()}
+            finished = dict(self.finished)
+
+        downloaded = sum(p["downloaded_bytes"] for p in active.values())
+        total = sum(max(p["total_bytes"], p["downloaded_bytes"]) for p in active.values())
+        speed = sum(p["speed"] for p in active.values())
+        average_size = sum(finished.values()) / len(finished) if finished else 0
+        remaining = total - downloaded + average_size * queued
+        return {
+            "time": time.time(),
+            "active": len(active),
+            "finished": len(finished),
+            "queued": queued,
+            "downloaded_bytes": downloaded + sum(finished.values()),
+            "remaining_bytes": remaining,
+            "speed": speed,
+            "eta": remaining / speed if speed else None,
+            "episodes": active,
+        }
+
+    def format_line(self) -> str:
+        snap = self.snapshot()
+        return (
+            f"Downloading: {snap['active']}, Queued: {snap['queued']}, Done: {snap['finished']}"
+            f" | {format_bytes(snap['speed'])}/s"
+            f" | {format_bytes(snap['remaining_bytes'])} left"
+            f" | ETA {format_seconds(snap['eta'])}"
+        )
+
+    def write_jsonl(self) -> None:
+        if not self.jsonl_path:
+            return
+        line = json.dumps(self.snapshot()) + "\n"
+        with self._write_lock, open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.write(line)
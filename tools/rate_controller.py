@@ -0,0 +1,120 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class _Bucket:
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        # start with a full burst so a cold start isn't paced
+        self.tokens = max(1.0, rate)
+        self.updated = time.monotonic()
+        self.last_cut = 0.0
+
+
+class HostRateController:
+    """
+    Per-host token bucket whose rate adapts with AIMD.
+
+    A new host starts at `max_rate`, so healthy hosts are effectively unthrottled. Throttling
+    responses such as 429, 5xx or a missing fragment multiply the rate by `decrease`, every
+    successful request then adds a little capacity back (additive increase, roughly `increase`
+    requests/s per second of healthy traffic). One instance is shared by every
+    download thread, see `shared_rate_controller`.
+    """
+
+    THROTTLE_STATUSES: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        initial_rate: float | None = None,
+        min_rate: float = 0.5,
+        max_rate: float = 64.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            initial_rate: Requests per second allowed for a host never seen before, defaults
+                to `max_rate`
+            min_rate / max_rate: Bounds of the per-host rate
+            increase: Additive increase per second of successful requests
+            decrease: Multiplier applied on a throttling error
+            cooldown: Seconds after a cut in which further errors don't cut again,
+                so one burst of failures only halves the rate once
+        """
+        self.initial_rate = max_rate if initial_rate is None else initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._buckets: dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _bucket(self, host: str) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _Bucket(self.initial_rate)
+        return bucket
+
+    def acquire(self, url: str) -> None:
+        """Block until the host of `url` has a free token."""
+        host = self.host(url)
+        while True:
+            with self._lock:
+                bucket = self._bucket(host)
+                now = time.monotonic()
+                # allow a burst of up to one second worth of requests
+                capacity = max(1.0, bucket.rate)
+                bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * bucket.rate)
+                bucket.updated = now
+                if bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    return
+                wait = (1 - bucket.tokens) / bucket.rate
+            time.sleep(wait)
+
+    def success(self, url: str) -> None:
+        with self._lock:
+            bucket = self._bucket(self.host(url))
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase / bucket.rate)
+
+    def failure(self, url: str) -> None:
+        with self._lock:
+            bucket = self._bucket(self.host(url))
+            now = time.monotonic()
+            if now - bucket.last_cut < self.cooldown:
+                return
+            bucket.last_cut = now
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            bucket.tokens = min(bucket.tokens, 0.0)
+
+    def report(self, url: str, status_code: int) -> None:
+        """Feed a response status into the controller."""
+        if status_code in self.THROTTLE_STATUSES or status_code == 404:
+            self.failure(url)
+        elif status_code < 400:
+            self.success(url)
+
+    def rate(self, url: str) -> float:
+        with self._lock:
+            return self._bucket(self.host(url)).rate
+
+
+_shared: HostRateController | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_rate_controller() -> HostRateController:
+    """The process-wide controller used by all downloads."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HostRateController()
+        return _shared
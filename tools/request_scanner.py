@@ -0,0 +1,98 @@
+import queue
+import re
+import time
+from typing import Any
+
+
+def purge_requests(driver: Any) -> None:
+    """
+    Free every request selenium-wire has stored for `driver`.
+
+    `driver.requests` returns a copy of the buffer, so clearing that list frees nothing.
+    """
+    del driver.requests
+
+
+class RequestScanner:
+    """
+    Incremental view over the requests captured by a selenium-wire driver.
+
+    A response interceptor pushes every completed request onto a queue, so callers are
+    woken as soon as new traffic arrives instead of re-reading the full `driver.requests`
+    buffer on a timer. Each url is only handed out once per scanner. Only urls matching the
+    driver's selenium-wire `scopes` are handed out, like the proxy stores them.
+    """
+
+    def __init__(self, driver: Any) -> None:
+        self.driver = driver
+        self.seen: set[str] = set()
+        self._events: queue.Queue = queue.Queue()
+        self._scopes = [re.compile(scope) for scope in getattr(driver, "scopes", None) or []]
+        self._previous_interceptor = getattr(driver, "response_interceptor", None)
+        driver.response_interceptor = self._on_response
+
+        # pick up anything that completed before the interceptor was installed
+        for request in driver.requests:
+            if request.response and self._in_scope(request.url):
+                self._events.put((request.url, dict(request.headers)))
+
+    def _in_scope(self, url: str) -> bool:
+        return not self._scopes or any(scope.search(url) for scope in self._scopes)
+
+    def _on_response(self, request: Any, response: Any) -> None:
+        if self._in_scope(request.url):
+            self._events.put((request.url, dict(request.headers)))
+        if self._previous_interceptor:
+            self._previous_interceptor(request, response)
+
+    def wait(self, timeout: float) -> list[tuple[str, dict[str, str]]]:
+        """
+        Block until at least one unseen request completes, `notify` is called or `timeout`
+        seconds pass.
+
+        Returns a list of (lowercased url, request headers) for requests not returned before.
+        """
+        deadline = time.monotonic() + timeout
+        fresh: list[tuple[str, dict[str, str]]] = []
+        while not fresh:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = self._events.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if event is None:
+                break
+            self._collect(*event, fresh)
+            # drain whatever else arrived in the same burst
+            while True:
+                try:
+                    event = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                if event is None:
+                    return fresh
+                self._collect(*event, fresh)
+        return fresh
+
+    def notify(self) -> None:
+        """Wake up a pending `wait` without a new request, e.g. when background work finished."""
+        self._events.put(None)
+
+    def _collect(self, url: str, headers: dict[str, str], fresh: list) -> None:
+        uri = url.lower()
+        if uri in self.seen:
+            return
+        self.seen.add(uri)
+        fresh.append((uri, headers))
+
+    def close(self) -> None:
+        """Restore the driver's previous response interceptor."""
+        if self._previous_interceptor:
+            self.driver.response_interceptor = self._previous_interceptor
+        else:
+            try:
+                del self.driver.response_interceptor
+            except AttributeError:
+                pass
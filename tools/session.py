@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from typing import Any
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import brotli  # noqa: F401  # urllib3 decodes br responses when brotli is installed
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# shared by all extractors, Accept-Encoding lets html pages arrive compressed
+HEADERS: dict[str, str] = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like Gecko) Chrome/23.0.1271.64 Safari/537.11",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Charset": "ISO-8859-1,utf-8;q=0.7,*;q=0.3",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Accept-Language": "en-US,en;q=0.8",
+    "Connection": "keep-alive",
+}
+
+
+class TimedSession(requests.Session):
+    """
+    Keep-alive session with a retry policy, a default timeout and per-request timing.
+
+    The last `recent` requests are kept in `timings` as {"method", "host", "status", "seconds",
+    "bytes"}, status is None when the request failed without a response. Totals per host over
+    the whole run are kept in `hosts`, see `host_totals`.
+
+    Retries on 429 and 5xx responses are handled by urllib3, once they run out the last response
+    is returned as usual so callers can still check `status_code`.
+    """
+
+    def __init__(self, timeout: float = 30, retries: int = 3, pool_size: int = 16, recent: int = 1000) -> None:
+        super().__init__()
+        self.timeout = timeout
+        self.timings: deque[dict[str, Any]] = deque(maxlen=recent)
+        self.hosts: dict[str, dict[str, float]] = {}
+        self._timings_lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:  # type: ignore[override]
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException:
+            self._record(method, url, None, started, 0)
+            raise
+        size = 0 if kwargs.get("stream") else len(response.content)
+        self._record(method, url, response.status_code, started, size)
+        return response
+
+    def _record(self, method: str, url: str, status: int | None, started: float, size: int) -> None:
+        host = urlparse(url).netloc
+        seconds = time.perf_counter() - started
+        with self._timings_lock:
+            self.timings.append(
+                {"method": method.upper(), "host": host, "status": status, "seconds": seconds, "bytes": size}
+            )
+            totals = self.hosts.setdefault(host, {"requests": 0, "errors": 0, "seconds": 0.0, "bytes": 0})
+            totals["requests"] += 1
+            totals["errors"] += status is None or status >= 400
+            totals["seconds"] += seconds
+            totals["bytes"] += size
+
+    def host_totals(self) -> dict[str, dict[str, float]]:
+        """Requests, errors, seconds and bytes per host since the session was created."""
+        with self._timings_lock:
+            return {host: dict(totals) for host, totals in self.hosts.items()}
+
+
+_session: TimedSession | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> TimedSession:
+    """The process-wide session used for every request made outside the browser."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = TimedSession()
+        return _session
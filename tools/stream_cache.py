@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from tools.session import get_session
+
+# query parameters CDNs commonly use for the unix time a signed url stops working
+EXPIRY_PARAMS: tuple[str, ...] = ("expires", "expire", "expiry", "exp", "e", "validto", "deadline")
+
+
+def infer_expiry(url: str) -> float | None:
+    """
+    Read the expiry time (unix seconds) out of a signed url, None if it has no known signature.
+    """
+    query = {key.lower(): values[0] for key, values in parse_qs(urlparse(url).query).items()}
+
+    for param in EXPIRY_PARAMS:
+        value = query.get(param)
+        if value and value.isdigit() and int(value) > 1_000_000_000:
+            # some CDNs sign in milliseconds
+            return int(value) / 1000 if int(value) > 10_000_000_000 else float(int(value))
+
+    # AWS style: signing date + lifetime in seconds
+    amz_date, amz_expires = query.get("x-amz-date"), query.get("x-amz-expires")
+    if amz_date and amz_expires and amz_expires.isdigit():
+        try:
+            signed = datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        return signed.timestamp() + int(amz_expires)
+    return None
+
+
+def is_url_alive(url: str, headers: dict[str, str], timeout: int = 10) -> bool:
+    """Cheap liveness check for urls without a readable expiry."""
+    try:
+        response = get_session().head(url, headers=headers, timeout=timeout, allow_redirects=True)
+        if response.status_code in (403, 405, 501):
+            # some origins reject HEAD, only read the first bytes of a GET instead
+            response = get_session().get(url, headers=headers, timeout=timeout, stream=True)
+            response.close()
+        return response.status_code < 400
+    except requests.RequestException:
+        return False
+
+
+class StreamCache:
+    """
+    On-disk cache of captured episode streams.
+
+    Maps (episode page url, server, sub/dub) to the captured media dict (m3u8, vtt, headers...).
+    Entries are fresh while the signed m3u8 url has not expired; urls without a readable
+    expiry are checked with a HEAD request once they are older than `check_after` seconds.
+    """
+
+    def __init__(self, path: str, margin: int = 300, check_after: int = 600, max_age: int = 86400) -> None:
+        """
+        Args:
+            path: SQLite database file, parent directories are created
+            margin: Seconds before the signed expiry at which an entry counts as stale
+            check_after: Age in seconds after which unsigned entries are verified over HTTP
+            max_age: Entries older than this are always stale
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.margin = margin
+        self.check_after = check_after
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS streams (
+                    episode_url TEXT NOT NULL,
+                    server TEXT NOT NULL,
+                    download_type TEXT NOT NULL,
+                    media TEXT NOT NULL,
+                    captured_at REAL NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (episode_url, server, download_type)
+                )
+                """
+            )
+
+    def put(self, episode_url: str, server: str, download_type: str, media: dict[str, Any]) -> None:
+        entry = {key: media[key] for key in ("m3u8", "vtt", "all-vtt", "headers", "server") if key in media}
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO streams VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    episode_url,
+                    server.lower(),
+                    download_type,
+                    json.dumps(entry),
+                    time.time(),
+                    infer_expiry(media["m3u8"]),
+                ),
+            )
+
+    def get(self, episode_url: str, download_type: str, servers: list[str] | None = None) -> dict[str, Any] | None:
+        """
+        Return the freshest usable entry, preferring `servers` in order. With no servers
+        given an entry for any server is accepted. Stale entries are removed.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT server, media, captured_at, expires_at FROM streams "
+                "WHERE episode_url = ? AND download_type = ? ORDER BY captured_at DESC",
+                (episode_url, download_type),
+            ).fetchall()
+
+        wanted = [server.lower().strip() for server in servers or []]
+        if wanted:
+            rows = sorted(
+                (row for row in rows if row[0] in wanted),
+                key=lambda row: wanted.index(row[0]),
+            )
+
+        for server, media, captured_at, expires_at in rows:
+            entry = json.loads(media)
+            if self._is_fresh(entry, captured_at, expires_at):
+                return entry
+            with self._lock, self._db:
+                self._db.execute(
+                    "DELETE FROM streams WHERE episode_url = ? AND server = ? AND download_type = ?",
+                    (episode_url, server, download_type),
+                )
+        return None
+
+    def _is_fresh(self, entry: dict[str, Any], captured_at: float, expires_at: float | None) -> bool:
+        now = time.time()
+        if now - captured_at > self.max_age:
+            return False
+        if expires_at is not None:
+            return now < expires_at - self.margin
+        if now - captured_at < self.check_after:
+            return True
+        return is_url_alive(entry["m3u8"], entry.get("headers", {}))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
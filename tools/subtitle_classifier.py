@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+import requests
+from langdetect import detect as detect_lang
+
+from tools.session import get_session
+
+
+class SubtitleClassifier:
+    """
+    Detects the language of candidate subtitle files off the capture loop.
+
+    Every url is downloaded and classified at most once per run, later lookups of the
+    same url share the cached future.
+    """
+
+    def __init__(self, encoding: str = "utf-8", workers: int = 4, session: requests.Session | None = None) -> None:
+        self.encoding = encoding
+        self.session = session or get_session()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vtt-classifier")
+        self._results: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        url: str,
+        headers: dict[str, str],
+        on_done: Callable[[Future], None] | None = None,
+    ) -> Future:
+        """
+        Queue `url` for classification, or return the cached result if it was seen before.
+
+        The future resolves to the detected language code, or None if the file could not be
+        downloaded or classified. `on_done` is called once the result is available.
+        """
+        with self._lock:
+            future = self._results.get(url)
+            if future is None:
+                future = self._executor.submit(self._classify, url, headers)
+                self._results[url] = future
+        if on_done:
+            future.add_done_callback(on_done)
+        return future
+
+    def _classify(self, url: str, headers: dict[str, str]) -> str | None:
+        try:
+            content = self.session.get(url, headers=headers, timeout=30).content
+            return detect_lang(content.decode(self.encoding))
+        except Exception:
+            return None
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)